@@ -2,7 +2,7 @@ import sqlite3
 import os
 import json
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import re
 import unicodedata
 from pathlib import Path
@@ -83,6 +83,8 @@ def ensure_concept_embeddings_table():
         ''')
     # Index for faster lookup by topic
     c.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_topic ON concept_embeddings (topic)')
+    # Exact-signature lookups (backfill anti-join, dedup existence checks)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_concept_text ON concept_embeddings (concept_text)')
     conn.commit()
     conn.close()
 
@@ -440,6 +442,32 @@ def get_recent_concepts_by_category_scope(
     finally:
         conn.close()
 
+def get_topic_question_history(topic: str) -> List[Dict[str, str]]:
+    """Fetch concept title + question text for every question under `topic` in one scan."""
+    if not topic:
+        return []
+
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            "SELECT tags, question_text FROM questions WHERE topic = ? ORDER BY id DESC",
+            (topic,)
+        )
+        history = []
+        for row in c.fetchall():
+            concepts = _extract_concepts_from_tag_values([row[0]])
+            history.append({
+                "concept": concepts[0] if concepts else "",
+                "question_text": row[1] or "",
+            })
+        return history
+    except Exception as e:
+        logging.error(f"Topic history fetch failed: {e}")
+        return []
+    finally:
+        conn.close()
+
 def _extract_concept_tag(tags: Any) -> Optional[str]:
     tags_list = tags
     if isinstance(tags_list, str):
@@ -993,6 +1021,105 @@ def find_exact_duplicate_question_id(
     finally:
         conn.close()
 
+def _find_existing_duplicate_id(data: Dict[str, Any], qa_signature: Optional[str]) -> Optional[int]:
+    """Return the id of an existing question that `data` duplicates, if any."""
+    category = data.get("category")
+    source_material = data.get("source_material")
+    question_text = data.get("question_text")
+
+    # Strict near-duplicate text check per category
+    if qa_signature and source_material and category:
+        base_category = _strip_part_suffix(category)
+        if base_category and base_category != category:
+            match_id = find_duplicate_qa_signature(
+                source_material,
+                category,
+                qa_signature,
+                category_prefix=base_category
+            )
+        else:
+            match_id = find_duplicate_qa_signature(
+                source_material,
+                category,
+                qa_signature
+            )
+        if match_id:
+            logging.info(
+                "Skipping duplicate concept+answer in category scope "
+                f"(matched id {match_id})."
+            )
+            return match_id
+
+    # QA Tag Generation Removed to prevent UI clutter
+    # We now compute signatures dynamically during retrieval.
+    # if qa_tag: ... removed
+    if source_material and category and question_text:
+        base_category = _strip_part_suffix(category)
+        if base_category and base_category != category:
+            match_id = find_exact_duplicate_question_id(
+                source_material,
+                category,
+                question_text,
+                category_prefix=base_category
+            )
+        else:
+            match_id = find_exact_duplicate_question_id(
+                source_material,
+                category,
+                question_text
+            )
+        if match_id:
+            logging.info(
+                "Skipping near-duplicate question_text in category scope "
+                f"(matched id {match_id})."
+            )
+            return match_id
+    return None
+
+def _insert_question_row(c, conn, data: Dict[str, Any]) -> Optional[int]:
+    """Insert one question row plus its topic links; caller owns the transaction."""
+    # Topic normalization disabled to avoid cross-part misassignment.
+    normalized_topic = data.get("topic")
+    source_material = data.get("source_material")
+    category = data.get("category")
+
+    c.execute('''
+        INSERT INTO questions (source_material, category, topic, question_text, options, correct_answer_index, explanation_data, tags)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING id
+    ''', (
+        source_material,
+        category,
+        normalized_topic,
+        data.get("question_text"),
+        json.dumps(data.get("options")),
+        data.get("correct_answer_index"),
+        json.dumps(data.get("explanation_data")),
+        json.dumps(data.get("tags"))
+    ))
+
+    inserted = c.fetchone()
+    question_id = None
+    if inserted:
+        try:
+            question_id = int(inserted["id"])
+        except Exception:
+            question_id = int(inserted[0])
+
+    topic_links = _dedupe_topics(data.get("topic_links"))
+    normalized_topic_clean = _normalize_topic_value(normalized_topic)
+    if normalized_topic_clean and normalized_topic_clean not in topic_links:
+        topic_links.insert(0, normalized_topic_clean)
+    if topic_links:
+        link_question_to_topics(
+            question_id=question_id,
+            topics=topic_links,
+            source_material=source_material,
+            category=category,
+            conn=conn
+        )
+    return question_id
+
 def add_question(data: Dict[str, Any]) -> Optional[int]:
     """
     Inserts a question into the DB and initializes its review state.
@@ -1003,108 +1130,18 @@ def add_question(data: Dict[str, Any]) -> Optional[int]:
     try:
         ensure_question_topic_links_table()
 
-        # 1. Topic normalization disabled to avoid cross-part misassignment.
-        original_topic = data.get("topic")
-        normalized_topic = original_topic
-        
         # Deduplication Check (concept + answer pair)
-        tags_list = data.get("tags", [])
         qa_signature = build_qa_signature(
             data.get("question_text"),
             data.get("options"),
             data.get("correct_answer_index"),
-            tags_list
+            data.get("tags", [])
         )
+        if _find_existing_duplicate_id(data, qa_signature):
+            conn.close()
+            return None
 
-        # Strict near-duplicate text check per category
-        category = data.get("category")
-        source_material = data.get("source_material")
-        question_text = data.get("question_text")
-        if qa_signature and source_material and category:
-            base_category = _strip_part_suffix(category)
-            if base_category and base_category != category:
-                match_id = find_duplicate_qa_signature(
-                    source_material,
-                    category,
-                    qa_signature,
-                    category_prefix=base_category
-                )
-            else:
-                match_id = find_duplicate_qa_signature(
-                    source_material,
-                    category,
-                    qa_signature
-                )
-            if match_id:
-                logging.info(
-                    "Skipping duplicate concept+answer in category scope "
-                    f"(matched id {match_id})."
-                )
-                conn.close()
-                return None
-
-        # QA Tag Generation Removed to prevent UI clutter
-        # We now compute signatures dynamically during retrieval.
-        # if qa_tag: ... removed
-        if source_material and category and question_text:
-            base_category = _strip_part_suffix(category)
-            if base_category and base_category != category:
-                match_id = find_exact_duplicate_question_id(
-                    source_material,
-                    category,
-                    question_text,
-                    category_prefix=base_category
-                )
-            else:
-                match_id = find_exact_duplicate_question_id(
-                    source_material,
-                    category,
-                    question_text
-                )
-            if match_id:
-                logging.info(
-                    "Skipping near-duplicate question_text in category scope "
-                    f"(matched id {match_id})."
-                )
-                conn.close()
-                return None
-        
-        # Insert Question
-        c.execute('''
-            INSERT INTO questions (source_material, category, topic, question_text, options, correct_answer_index, explanation_data, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            RETURNING id
-        ''', (
-            source_material,
-            category,
-            normalized_topic,
-            question_text,
-            json.dumps(data.get("options")),
-            data.get("correct_answer_index"),
-            json.dumps(data.get("explanation_data")),
-            json.dumps(data.get("tags"))
-        ))
-        
-        inserted = c.fetchone()
-        question_id = None
-        if inserted:
-            try:
-                question_id = int(inserted["id"])
-            except Exception:
-                question_id = int(inserted[0])
-
-        topic_links = _dedupe_topics(data.get("topic_links"))
-        normalized_topic_clean = _normalize_topic_value(normalized_topic)
-        if normalized_topic_clean and normalized_topic_clean not in topic_links:
-            topic_links.insert(0, normalized_topic_clean)
-        if topic_links:
-            link_question_to_topics(
-                question_id=question_id,
-                topics=topic_links,
-                source_material=source_material,
-                category=category,
-                conn=conn
-            )
+        question_id = _insert_question_row(c, conn, data)
         
         # Initialize Review State (User 1)
         c.execute('''
@@ -1121,6 +1158,72 @@ def add_question(data: Dict[str, Any]) -> Optional[int]:
     finally:
         conn.close()
 
+def add_questions_bulk(questions: List[Dict[str, Any]]) -> List[Optional[int]]:
+    """
+    Inserts many questions on one connection with a single commit.
+
+    Applies the same duplicate checks as add_question (also within the batch),
+    then writes every surviving row, its topic links and its review state in
+    one transaction. Returns ids aligned with `questions`; None marks a skipped
+    duplicate. If the transaction fails nothing is saved.
+    """
+    ensure_question_topic_links_table()
+
+    # Dedup reads happen before the write transaction so the lock is held briefly.
+    to_insert: List[int] = []
+    seen_signatures = set()
+    seen_texts = set()
+    for idx, data in enumerate(questions):
+        qa_signature = build_qa_signature(
+            data.get("question_text"),
+            data.get("options"),
+            data.get("correct_answer_index"),
+            data.get("tags", [])
+        )
+        if _find_existing_duplicate_id(data, qa_signature):
+            continue
+        # Same category-scoped checks against rows earlier in this batch.
+        if data.get("source_material") and data.get("category"):
+            scope = (data["source_material"], _strip_part_suffix(data["category"]))
+            sig_key = (scope, qa_signature)
+            text_key = (scope, _normalize_question_text(data.get("question_text") or ""))
+            if (qa_signature and sig_key in seen_signatures) or (text_key[1] and text_key in seen_texts):
+                logging.info("Skipping duplicate question within bulk batch.")
+                continue
+            if qa_signature:
+                seen_signatures.add(sig_key)
+            if text_key[1]:
+                seen_texts.add(text_key)
+        to_insert.append(idx)
+
+    ids: List[Optional[int]] = [None] * len(questions)
+    if not to_insert:
+        return ids
+
+    conn = get_db_connection()
+    c = conn.cursor()
+    try:
+        if get_db_engine() == "sqlite":
+            c.execute("BEGIN IMMEDIATE")
+        for idx in to_insert:
+            ids[idx] = _insert_question_row(c, conn, questions[idx])
+
+        # Initialize Review State (User 1)
+        now = datetime.now()
+        c.executemany('''
+            INSERT INTO reviews (question_id, user_id, ease_factor, interval, repetitions, next_review_date, last_review_date)
+            VALUES (?, 1, 2.5, 0, 0, ?, ?)
+        ''', [(qid, now, None) for qid in ids if qid])
+
+        conn.commit()
+        return ids
+    except Exception as e:
+        print(f"Error adding questions in bulk: {e}")
+        conn.rollback()
+        return [None] * len(questions)
+    finally:
+        conn.close()
+
 def check_concept_exists(concept_text: str, topic: str) -> bool:
     """
     Checks if a question with this concept already exists in the given topic (fuzzy match).
@@ -1291,6 +1394,29 @@ def save_concept_embedding(topic: str, concept: str, embedding: List[float]):
     finally:
         conn.close()
 
+def save_concept_embeddings(rows: List[Tuple[str, str, List[float]]]) -> int:
+    """
+    Saves many (topic, concept, embedding) rows in one transaction.
+    Returns the number of rows written (0 on failure).
+    """
+    if not rows:
+        return 0
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.executemany('''
+            INSERT INTO concept_embeddings (topic, concept_text, embedding_json)
+            VALUES (?, ?, ?)
+        ''', [(topic, concept, json.dumps(embedding)) for topic, concept, embedding in rows])
+        conn.commit()
+        return len(rows)
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Failed to save {len(rows)} embeddings: {e}")
+        return 0
+    finally:
+        conn.close()
+
 def get_all_visual_tags() -> List[str]:
     """
     Fetches all distinct tags starting with 'visual:' from the database.
@@ -1634,3 +1760,55 @@ def delete_difficulty_template(template_id: int) -> bool:
         return c.rowcount > 0
     finally:
         conn.close()
+
+
+# ─── LLM Response Cache ─────────────────────────────────────────────
+
+def ensure_llm_response_cache_table():
+    """Create llm_response_cache table if it doesn't exist."""
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                topic TEXT,
+                response_text TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_cached_llm_response(cache_key: str) -> Optional[str]:
+    """Return the cached raw LLM response for cache_key, if any."""
+    ensure_llm_response_cache_table()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT response_text FROM llm_response_cache WHERE cache_key = ?", (cache_key,))
+        row = c.fetchone()
+        return row["response_text"] if row else None
+    finally:
+        conn.close()
+
+
+def save_llm_response(cache_key: str, topic: str, response_text: str) -> None:
+    """Store a raw LLM response under cache_key (first write wins)."""
+    ensure_llm_response_cache_table()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            "INSERT INTO llm_response_cache (cache_key, topic, response_text, created_at) VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (cache_key, topic, response_text, datetime.now()),
+        )
+        conn.commit()
+    except Exception as e:
+        logging.error(f"Failed to cache LLM response for {topic}: {e}")
+    finally:
+        conn.close()
@@ -97,6 +97,9 @@ class _CompatCursor:
     def fetchall(self) -> Any:
         return self._cursor.fetchall()
 
+    def fetchmany(self, size: int = 1000) -> Any:
+        return self._cursor.fetchmany(size)
+
     @property
     def rowcount(self) -> int:
         return int(getattr(self._cursor, "rowcount", 0) or 0)
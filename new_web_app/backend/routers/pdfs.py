@@ -2,13 +2,21 @@
 PDF Manifests Router
 Provides endpoints to access processed PDF manifests for question generation.
 """
-from fastapi import APIRouter, HTTPException
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
+import hashlib
 import json
 import re
 from functools import lru_cache
 
+# Import from core (assumes CWD is new_web_app)
+try:
+    from core.fastjson import dumps as json_dumps
+except ImportError:
+    # Fallback for relative import if run differently
+    from ...core.fastjson import dumps as json_dumps
+
 router = APIRouter(prefix="/pdfs", tags=["PDFs"])
 
 PROCESSED_PDFS_DIR = Path(__file__).parent.parent.parent.parent / "shared" / "processed_pdfs"
@@ -23,6 +31,28 @@ except Exception:
     PdfReader = None
 
 @router.get("/manifests")
+def manifests_endpoint(request: Request) -> Response:
+    """
+    All manifests as pre-serialized JSON with a content ETag; a matching
+    If-None-Match gets an empty 304 instead of the body.
+    """
+    body, etag = get_all_manifests_bytes()
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def get_all_manifests_bytes() -> Tuple[bytes, str]:
+    """
+    get_all_manifests() serialized once (orjson when installed) plus its ETag.
+    Not cached across calls: the question counts in it change with every
+    generated question, so the bytes are rebuilt per request.
+    """
+    body = json_dumps(get_all_manifests())
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
 def get_all_manifests() -> Dict[str, Any]:
     """
     Get all manifest.json files from processed_pdfs directory.
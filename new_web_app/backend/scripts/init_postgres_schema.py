@@ -260,6 +260,7 @@ SCHEMA_STATEMENTS: list[str] = [
     "CREATE INDEX IF NOT EXISTS idx_questions_category ON questions (source_material, category)",
     "CREATE INDEX IF NOT EXISTS idx_jobs_status ON background_jobs (status)",
     "CREATE INDEX IF NOT EXISTS idx_embeddings_topic ON concept_embeddings (topic)",
+    "CREATE INDEX IF NOT EXISTS idx_embeddings_concept_text ON concept_embeddings (concept_text)",
     "CREATE INDEX IF NOT EXISTS idx_qtl_scope_topic ON question_topic_links (source_material, category, topic, question_id)",
     "CREATE INDEX IF NOT EXISTS idx_qtl_topic ON question_topic_links (topic, question_id)",
     "CREATE INDEX IF NOT EXISTS idx_qtl_question ON question_topic_links (question_id)",
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import os
 import re
@@ -64,6 +65,11 @@ DEFAULT_DIFFICULTY_LEVELS = {
     "4": "ZOR ve ÇOK ZOR seviyede (Derece öğrencileri ve TUS derecesi için)"
 }
 
+def question_text_key(text: str) -> str:
+    """Key used to match generated question stems against existing ones."""
+    return re.sub(r"\s+", " ", (text or "").casefold()).strip()
+
+
 class BulkGenerator:
     """
     Generates questions in bulk (e.g. 10 at a time) using a specialized
@@ -72,39 +78,35 @@ class BulkGenerator:
 
     def __init__(self):
         self.client = GeminiClient()
+        # (cache_key, topic, response_text) of the last fresh, parseable response;
+        # written to the cache by commit_cached_response() once its questions are saved.
+        self._pending_cache_entry = None
 
-    def generate_bulk(self, topic: str, count: int = 10, difficulty: int = 3, category: str = None, offset_history: List[str] = None, source_pdf: str = None, api_key: str = None, custom_prompt_sections: Dict = None, custom_difficulty_levels: Dict = None) -> List[Dict]:
+    def generate_bulk(self, topic: str, count: int = 10, difficulty: int = 3, category: str = None, offset_history: List[str] = None, source_pdf: str = None, api_key: str = None, custom_prompt_sections: Dict = None, custom_difficulty_levels: Dict = None, use_cache: bool = False, existing_question_keys: Optional[set] = None) -> List[Dict]:
         """
         Main entry point.
         1. Refines prompt with history (deduplication).
         2. Uploads/Caches PDF if provided.
         3. Calls Gemini (long context with PDF).
         4. Parses output.
+
+        With use_cache=True, an identical earlier request's raw Gemini response
+        (keyed by the exact prompt + source PDF) is reused. A fresh response is only
+        stored when the caller reports saved questions via commit_cached_response();
+        a reply whose questions are all filtered out or rejected is never replayed.
+        Since the prompt embeds the history summary, saving new questions for the
+        topic naturally invalidates the entry.
+
+        existing_question_keys is an optional set of question_text_key() values;
+        parsed questions whose stem is already stored are dropped before saving.
         """
         history = offset_history or []
+        self._pending_cache_entry = None
         # Logging is opt-in via env flags.
         log_prompt = os.getenv("BULKGEN_LOG_PROMPT", "0") == "1"
         log_prompt_full = os.getenv("BULKGEN_LOG_PROMPT_FULL", "0") == "1"
         log_response_full = os.getenv("BULKGEN_LOG_RESPONSE_FULL", "0") == "1"
         
-        # PDF Handling
-        cache_name = None
-        if source_pdf:
-            logger.info(f"📚 Using PDF Source: {source_pdf}")
-            try:
-                import fitz
-                with fitz.open(source_pdf) as doc:
-                    logger.info(f"📄 PDF page count: {doc.page_count}")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to read PDF page count: {e}")
-            try:
-                cache_name, _ = self.client.get_or_create_pdf_cache(source_pdf, specific_api_key=api_key)
-                if cache_name:
-                    logger.info(f"💾 PDF cache name: {cache_name}")
-            except Exception as e:
-                logger.error(f"❌ Failed to process PDF: {e}")
-                return []
-        
         prompt = self._construct_prompt(topic, count, history, difficulty=difficulty, category=category, source_pdf_path=source_pdf, custom_sections=custom_prompt_sections, custom_difficulty_levels=custom_difficulty_levels)
         
         logger.info(f"🚀 Sending Bulk Request for topic: {topic} (Diff: {difficulty}, History: {len(history)} items)")
@@ -114,8 +116,36 @@ class BulkGenerator:
         elif log_prompt:
             logger.info(f"🧾 Prompt (preview):\n{prompt[:2000]}")
         
-        # Call Gemini with caching support
-        response_text = self.client.generate_raw_text(prompt, cached_content=cache_name, specific_api_key=api_key) 
+        cache_key = None
+        response_text = None
+        if use_cache:
+            cache_key = self._response_cache_key(prompt, source_pdf)
+            response_text = self._load_cached_response(cache_key)
+            if response_text:
+                logger.info(f"♻️ Reusing cached response for topic: {topic}")
+        from_cache = bool(response_text)
+
+        if not from_cache:
+            # PDF Handling (only needed when Gemini is actually called)
+            cache_name = None
+            if source_pdf:
+                logger.info(f"📚 Using PDF Source: {source_pdf}")
+                try:
+                    import fitz
+                    with fitz.open(source_pdf) as doc:
+                        logger.info(f"📄 PDF page count: {doc.page_count}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to read PDF page count: {e}")
+                try:
+                    cache_name, _ = self.client.get_or_create_pdf_cache(source_pdf, specific_api_key=api_key)
+                    if cache_name:
+                        logger.info(f"💾 PDF cache name: {cache_name}")
+                except Exception as e:
+                    logger.error(f"❌ Failed to process PDF: {e}")
+                    return []
+
+            # Call Gemini with caching support
+            response_text = self.client.generate_raw_text(prompt, cached_content=cache_name, specific_api_key=api_key)
         
         if not response_text:
             logger.error("❌ No response from Gemini.")
@@ -125,9 +155,54 @@ class BulkGenerator:
             logger.info(f"📥 Response (full):\n{response_text}")
 
         questions = self._parse_bulk_response(response_text, topic)
+        if questions and cache_key and not from_cache:
+            self._pending_cache_entry = (cache_key, topic, response_text)
         logger.info(f"✅ Parsed {len(questions)} questions from bulk text.")
+        if existing_question_keys:
+            before = len(questions)
+            questions = [
+                q for q in questions
+                if question_text_key(q.get("question_text")) not in existing_question_keys
+            ]
+            if len(questions) < before:
+                logger.info(f"🛑 Dropped {before - len(questions)} questions already in the DB.")
         return questions
 
+    def commit_cached_response(self) -> None:
+        """
+        Stores the last generate_bulk(use_cache=True) response in the cache.
+        Call it only after at least one of its questions has been saved.
+        """
+        if self._pending_cache_entry:
+            self._store_cached_response(*self._pending_cache_entry)
+            self._pending_cache_entry = None
+
+    @staticmethod
+    def _response_cache_key(prompt: str, source_pdf: Optional[str]) -> str:
+        payload = json.dumps([prompt, source_pdf or ""], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cache_db():
+        try:
+            from backend import database
+        except ImportError:
+            from new_web_app.backend import database
+        return database
+
+    def _load_cached_response(self, cache_key: str) -> Optional[str]:
+        try:
+            return self._cache_db().get_cached_llm_response(cache_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Response cache lookup failed: {e}")
+            return None
+
+    def _store_cached_response(self, cache_key: str, topic: str, response_text: str) -> None:
+        try:
+            self._cache_db().save_llm_response(cache_key, topic, response_text)
+        except Exception as e:
+            logger.warning(f"⚠️ Response cache write failed: {e}")
+
     def _construct_prompt(self, topic: str, count: int, history: List[str], difficulty: int = 3, category: str = None, source_pdf_path: str = None, custom_sections: Dict = None, custom_difficulty_levels: Dict = None) -> str:
         def _extract_title(text: str) -> Optional[str]:
             if not text:
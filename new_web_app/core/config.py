@@ -0,0 +1,17 @@
+"""
+Process-wide environment: `.env` is parsed once, however many modules ask for it.
+"""
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def env():
+    """Loads `.env` into os.environ on first call (existing variables win) and returns os.environ."""
+    try:
+        from dotenv import load_dotenv
+        # Searched upward from this directory, as the core modules' own calls did.
+        load_dotenv()
+    except ImportError:
+        pass
+    return os.environ
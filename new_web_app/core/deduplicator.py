@@ -5,6 +5,11 @@ import math
 from typing import List, Optional
 from backend.database import get_topic_concepts_data, get_category_concepts_data, save_concept_embedding
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def cosine_similarity(v1, v2):
     """Compute cosine similarity between two vectors."""
     if not v1 or not v2:
@@ -19,6 +24,25 @@ def cosine_similarity(v1, v2):
         
     return dot_product / (norm_a * norm_b)
 
+def cosine_similarity_batch(query_vec, matrix) -> List[float]:
+    """
+    Cosine similarity of query_vec against every vector in matrix, in order.
+    Same results as calling cosine_similarity per row, but one matrix-vector
+    product when NumPy is available.
+    """
+    if not matrix:
+        return []
+    if np is None or not query_vec or any(not row or len(row) != len(query_vec) for row in matrix):
+        return [cosine_similarity(query_vec, row) for row in matrix]
+
+    q = np.asarray(query_vec, dtype=np.float64)
+    m = np.asarray(matrix, dtype=np.float64)
+    norms = np.linalg.norm(m, axis=1) * np.linalg.norm(q)
+    dots = m @ q
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sims = np.where(norms == 0, 0.0, dots / norms)
+    return sims.tolist()
+
 def check_duplicate_hybrid(
     new_concept: str, 
     topic: str, 
@@ -98,13 +122,12 @@ def check_duplicate_hybrid(
         except Exception as e:
             logging.warning(f"⚠️ Failed to save embedding for QA '{qa_signature[:50]}': {e}")
             
-        # Check against existing VALID embeddings
-        for record in existing_concepts:
-            if record['embedding']:
-                sim = cosine_similarity(new_embedding, record['embedding'])
-                if sim > threshold_semantic:
-                    logging.info(f"🛑 Duplicate found (Semantic {sim:.2f}): QA match")
-                    return True
+        # Check against existing VALID embeddings (scored together in one pass)
+        existing_embeddings = [record['embedding'] for record in existing_concepts if record['embedding']]
+        for sim in cosine_similarity_batch(new_embedding, existing_embeddings):
+            if sim > threshold_semantic:
+                logging.info(f"🛑 Duplicate found (Semantic {sim:.2f}): QA match")
+                return True
         
         # 4. Lazy Backfill (Optional / Best Effort)
         # DISABLE runtime backfill to prevent 429 quota errors during parallel generation
@@ -0,0 +1,37 @@
+"""
+Fastest installed JSON encoder, picked at import time: orjson, then ujson, then
+the stdlib.
+
+dumps() always returns compact UTF-8 bytes without ASCII escaping (what FastAPI's
+JSONResponse sends), so callers can len() the result whichever backend is used.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+elif ujson is not None:
+    BACKEND = "ujson"
+
+    def dumps(obj) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+else:
+    BACKEND = "json"
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
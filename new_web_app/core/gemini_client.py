@@ -13,14 +13,15 @@ import re
 import random
 import time
 import logging
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 
-# Load .env file
+# Load .env (parsed once per process)
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    from .config import env
 except ImportError:
-    pass
+    from config import env
+env()
 
 # --- JSON SCHEMAS FOR STRUCTURED OUTPUT ---
 from google import genai
@@ -623,6 +624,13 @@ KURALLAR:
 """
 
 def construct_system_prompt_blocks(existing_tags: list = []) -> str:
+    # Called for every generated question with mostly the same tag list; the
+    # rendered prompt is cached per (hashable) tag tuple.
+    return _construct_system_prompt_blocks(tuple(existing_tags or ()))
+
+
+@lru_cache(maxsize=512)
+def _construct_system_prompt_blocks(existing_tags: tuple) -> str:
     tags_hint = ""
     if existing_tags:
         tags_str = ", ".join([f'"{t}"' for t in existing_tags])
@@ -796,6 +804,9 @@ class GeminiClient:
             print(f"🔑 GeminiClient initialized with {len(self.api_keys)} API Keys.")
 
         self.api_key = self.api_keys[0] if self.api_keys else None
+        # genai.Client per API key (one for Vertex), reused so calls keep the
+        # client's pooled keep-alive connections instead of a new handshake each.
+        self._clients = {}
         self.client = self._build_client(api_key=self.api_key)
         
         # Load Reference Examples
@@ -846,7 +857,12 @@ class GeminiClient:
         GeminiClient._last_request_time = time.time()
 
     def _build_client(self, api_key: Optional[str] = None) -> genai.Client:
-        """Initialize a genai.Client for either Vertex or Gemini Developer API."""
+        """Return the (cached) genai.Client for either Vertex or Gemini Developer API."""
+        cache_key = None if self.vertex_enabled else api_key
+        cached = self._clients.get(cache_key)
+        if cached is not None:
+            return cached
+
         client_kwargs = {}
         if self.vertex_enabled:
             client_kwargs["vertexai"] = True
@@ -862,7 +878,9 @@ class GeminiClient:
             client_kwargs["api_key"] = api_key
         # Prevent indefinitely hanging HTTP calls (timeout is in milliseconds).
         client_kwargs["http_options"] = types.HttpOptions(timeout=DEFAULT_HTTP_TIMEOUT_MS)
-        return genai.Client(**client_kwargs)
+        client = genai.Client(**client_kwargs)
+        self._clients[cache_key] = client
+        return client
 
     def _load_reference_examples(self) -> dict:
         """Loads the reference_examples.json file."""
@@ -1613,6 +1631,23 @@ class GeminiClient:
             print(f"⚠️ Embedding failed: {e}")
             return []
 
+    def get_text_embeddings_batch(self, texts: List[str]) -> List[list]:
+        """
+        Embed several texts in one text-embedding-004 request.
+        Returns one list of floats per input, in order. Unlike get_text_embedding,
+        errors (including 429s) are raised so batch callers can back off.
+        """
+        if not texts:
+            return []
+        result = self.client.models.embed_content(
+            model="text-embedding-004",
+            contents=list(texts)
+        )
+        embeddings = [e.values for e in (result.embeddings or [])]
+        if len(embeddings) != len(texts):
+            raise RuntimeError(f"Embedding batch returned {len(embeddings)} vectors for {len(texts)} inputs")
+        return embeddings
+
     def generate_raw_text(self, prompt: str, model_type: str = "pro", cached_content: str = None, specific_api_key: str = None) -> str:
         """
         Public method to generate raw text from a prompt (no JSON enforcement).
@@ -33,12 +33,12 @@ except ImportError:
         sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
         import database
 
-# Load .env
+# Load .env (parsed once per process)
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    from .config import env
 except ImportError:
-    pass
+    from config import env
+env()
 
 
 class GenerationEngine:
@@ -87,7 +87,7 @@ class GenerationEngine:
         pdf_cache_name: Optional[str] = None,
         uploaded_file: Optional[object] = None,
     ) -> dict:
-        logging.info(f"\n🎯 Generating: {concept} ({topic})")
+        logging.info("\n🎯 Generating: %s (%s)", concept, topic)
         
         main_evidence = ""
         update_evidence = ""
@@ -97,7 +97,7 @@ class GenerationEngine:
 
         # --- Stage 1: PDF Cache or Evidence Override ---
         if source_pdf:
-            logging.info(f"📚 [1/3] Using PDF Source: {source_pdf}")
+            logging.info("📚 [1/3] Using PDF Source: %s", source_pdf)
             if not pdf_cache_name or not uploaded_file:
                 pdf_cache_name, uploaded_file = self.client.get_or_create_pdf_cache(
                     source_pdf,
@@ -301,7 +301,7 @@ class GenerationEngine:
                     opt["text"] = strip_source_references(opt.get("text"))
 
         print(f"   Draft: {draft['question_text'][:60]}...")
-        logging.info(f"📝 Draft ready: concept={concept} correct={draft.get('correct_option_id')}")
+        logging.info("📝 Draft ready: concept=%s correct=%s", concept, draft.get("correct_option_id"))
         updates_applied = []
         critique = {"sibling_suggestions": []}
         siblings = []
@@ -353,7 +353,8 @@ class GenerationEngine:
             or candidate_data.get("correct_option_id") != draft.get("correct_option_id")
         ):
             print("🛠️ Explanation revised question to align with evidence.")
-            logging.info("🛠️ Explanation revised question (%s)", _summarize_revision(draft, candidate_data))
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("🛠️ Explanation revised question (%s)", _summarize_revision(draft, candidate_data))
         # candidate_data['concept_tag'] = draft.get('concept_tag') # Removed to fix Schema forbidden extra field
         
         if 'explanation' not in candidate_data:
@@ -610,7 +611,7 @@ class GenerationEngine:
         try:
             # question_data is already formatted for DB by to_db_dict()
             qid = database.add_question(question_data)
-            logging.info(f"💾 Saved Question ID: {qid}")
+            logging.info("💾 Saved Question ID: %s", qid)
         except Exception as e:
             print(f"❌ Database Error: {e}")
 
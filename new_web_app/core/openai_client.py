@@ -8,12 +8,12 @@ import json
 import re
 from typing import Optional, Dict, Any, List
 
-# Load .env file
+# Load .env (parsed once per process)
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    from .config import env
 except ImportError:
-    pass
+    from config import env
+env()
 
 import openai
 from openai import OpenAI
@@ -0,0 +1,40 @@
+"""
+Opt-in profiling for the verification / measurement scripts.
+
+    run_main(main)                      # plain call
+    python script.py --profile          # cProfile: top 25 by cumulative time + script.prof
+    python script.py --lineprof         # line_profiler over `line_targets` (if installed)
+"""
+import cProfile
+import pstats
+import sys
+from pathlib import Path
+
+try:
+    from line_profiler import LineProfiler
+except ImportError:
+    LineProfiler = None
+
+
+def run_main(main, *, line_targets=(), argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if "--lineprof" in argv:
+        if LineProfiler is None:
+            print("⚠️ line_profiler is not installed; running without --lineprof.")
+        elif line_targets:
+            lp = LineProfiler(*line_targets)
+            result = lp.runcall(main)
+            lp.print_stats()
+            return result
+
+    if "--profile" not in argv:
+        return main()
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(main)
+    out_path = Path(sys.argv[0]).with_suffix(".prof").name
+    profiler.dump_stats(out_path)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    print(f"📈 Profile written to {out_path}")
+    return result
@@ -16,6 +16,9 @@ import re
 import unicodedata
 
 
+_STANDARD_OPTION_IDS = frozenset("ABCDE")
+
+
 # ============================================================================
 # BLOCK DEFINITIONS
 # ============================================================================
@@ -218,15 +221,19 @@ class QuestionItem(BlockBase):
         # 1. Validate DDX items match wrong options
         ddx_block = next((b for b in self.explanation.blocks if b.type == "mini_ddx"), None)
         if ddx_block:
-            wrong_option_ids = {opt.id for opt in self.options if opt.id != self.correct_option_id}
-            ddx_ids = {item.option_id for item in ddx_block.items}
-            
             # CHECK: Are we using standard A-E IDs?
             # If ddx_ids contains likely Roman Numerals (length > 1 or I/V/X chars), skip this check.
-            is_standard_options = all(len(did) == 1 and did in "ABCDE" for did in ddx_ids)
+            is_standard_options = True
+            ddx_ids = set()
+            for item in ddx_block.items:
+                did = item.option_id
+                ddx_ids.add(did)
+                if len(did) != 1 or did not in _STANDARD_OPTION_IDS:
+                    is_standard_options = False
             
             if is_standard_options:
                 # Check coverage logic only if we are using A-E
+                wrong_option_ids = {opt.id for opt in self.options} - {self.correct_option_id}
                 if ddx_ids != wrong_option_ids:
                     missing = wrong_option_ids - ddx_ids
                     extra = ddx_ids - wrong_option_ids
@@ -281,6 +288,19 @@ class QuestionItem(BlockBase):
 # VALIDATION UTILITIES
 # ============================================================================
 
+# Combining diacritical mark blocks stripped after NFKD decomposition.
+_COMBINING_MARKS = {
+    cp: None
+    for start, end in (
+        (0x0300, 0x036F),
+        (0x1AB0, 0x1AFF),
+        (0x1DC0, 0x1DFF),
+        (0x20D0, 0x20FF),
+        (0xFE20, 0xFE2F),
+    )
+    for cp in range(start, end + 1)
+}
+
 def validate_llm_output(raw_json: Union[str, dict]) -> QuestionItem:
     """
     Validate LLM output against QuestionItem schema.
@@ -290,8 +310,7 @@ def validate_llm_output(raw_json: Union[str, dict]) -> QuestionItem:
         if not value:
             return ""
         text = value.casefold()
-        text = unicodedata.normalize("NFKD", text)
-        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        text = unicodedata.normalize("NFKD", text).translate(_COMBINING_MARKS)
         text = text.replace("ı", "i")
         text = re.sub(r"\s+", " ", text).strip()
         return text
@@ -14,7 +14,18 @@ from __future__ import annotations
 import argparse
 from datetime import datetime
 from pathlib import Path
+import random
 import sys
+import time
+
+# Backoff for transient upstream failures (429/5xx/network) per user.
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+RETRY_MAX_TOTAL_SLEEP = 60.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# run_flashcard_generation maps these permanent DeepSeek errors to HTTP 500 too.
+PERMANENT_ERROR_MARKERS = ("authentication", "not configured")
 
 
 def _load_env() -> None:
@@ -40,23 +51,55 @@ def _parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status not in RETRYABLE_STATUS:
+        return False
+    detail = str(getattr(exc, "detail", "") or exc).lower()
+    return not any(marker in detail for marker in PERMANENT_ERROR_MARKERS)
+
+
+def _call_with_backoff(fn):
+    """Call fn(), retrying transient failures with capped, jittered exponential backoff."""
+    slept = 0.0
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt == RETRY_ATTEMPTS - 1 or not _is_transient(exc):
+                raise
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+            delay *= 0.5 + random.random() * 0.5
+            if slept + delay > RETRY_MAX_TOTAL_SLEEP:
+                raise
+            print(f"  retry {attempt + 1}/{RETRY_ATTEMPTS - 1} in {delay:.1f}s: {type(exc).__name__}: {exc}")
+            time.sleep(delay)
+            slept += delay
+
+
 def main() -> int:
     # Ensure repo root is on sys.path so `new_web_app.*` imports work when run from any CWD.
     repo_root = Path(__file__).resolve().parents[2]  # -> medical_quiz_app
     if str(repo_root) not in sys.path:
         sys.path.insert(0, str(repo_root))
 
-    _load_env()
+    # Parse first so --help / bad args return before dotenv and the router import chain.
     args = _parse_args()
+    if args.max_users <= 0:
+        print("Nothing to do (--max-users <= 0).")
+        return 0
+
+    _load_env()
 
     # Import after env load.
-    from new_web_app.backend.database import get_db_connection
+    from new_web_app.backend.database import get_db_connection, get_db_engine
     from new_web_app.backend.routers.flashcards import (
         ensure_generation_table,
         ensure_usage_table,
-        get_unused_highlight_stats,
-        has_active_generation,
-        mark_generation_status,
         run_flashcard_generation,
         MAX_HIGHLIGHT_LIMIT,
         MAX_FLASHCARD_CARDS,
@@ -67,109 +110,155 @@ def main() -> int:
     limit = args.limit if args.limit is not None else MAX_HIGHLIGHT_LIMIT
     max_cards = args.max_cards if args.max_cards is not None else MAX_FLASHCARD_CARDS
 
+    # One connection for the whole run; get_db_connection already applies the
+    # WAL / synchronous PRAGMAs for SQLite. The router writes to the same tables
+    # while this runs, so wait longer on locks than the default.
+    is_sqlite = get_db_engine() == "sqlite"
     conn = get_db_connection()
+    if is_sqlite:
+        conn.execute("PRAGMA busy_timeout=10000")
+
+    def begin_write() -> None:
+        # Take the write lock upfront so we never deadlock upgrading SHARED -> RESERVED.
+        if is_sqlite:
+            conn.execute("BEGIN IMMEDIATE")
+
     try:
         ensure_generation_table(conn)
         ensure_usage_table(conn)
         cur = conn.cursor()
 
+        # Candidates are failed users that currently pass the generation guards
+        # (enough unused highlights, no pending/processing run), so users that
+        # would be skipped never leave the database.
         params: list[object] = []
-        where = "WHERE status='failed'"
+        where = "WHERE r.status='failed'"
         if args.user_id is not None:
-            where += " AND user_id=?"
+            where += " AND r.user_id=?"
             params.append(args.user_id)
         if args.since:
-            where += " AND created_at >= ?"
+            where += " AND r.created_at >= ?"
             params.append(args.since)
 
         cur.execute(
             f"""
-            SELECT user_id, MAX(created_at) AS last_failed
-            FROM flashcard_generation_runs
+            SELECT r.user_id AS user_id,
+                   MAX(r.created_at) AS last_failed,
+                   s.question_count AS question_count,
+                   s.total_chars AS total_chars
+            FROM flashcard_generation_runs r
+            JOIN (
+                SELECT h.user_id AS user_id,
+                       COUNT(DISTINCT h.question_id) AS question_count,
+                       COALESCE(SUM(LENGTH(h.text_content)), 0) AS total_chars
+                FROM user_highlights h
+                LEFT JOIN flashcard_highlight_usage u
+                  ON u.highlight_id = h.id AND u.user_id = h.user_id
+                WHERE u.highlight_id IS NULL AND h.context_type = 'flashcard'
+                  AND h.user_id IN (
+                      SELECT user_id FROM flashcard_generation_runs WHERE status = 'failed'
+                  )
+                GROUP BY h.user_id
+            ) s ON s.user_id = r.user_id
             {where}
-            GROUP BY user_id
+              AND s.question_count >= ?
+              AND s.total_chars >= ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM flashcard_generation_runs a
+                  WHERE a.user_id = r.user_id AND a.status IN ('pending', 'processing')
+              )
+            GROUP BY r.user_id, s.question_count, s.total_chars
             ORDER BY last_failed DESC
             LIMIT ?
             """,
-            (*params, args.max_users),
+            (*params, MIN_FLASHCARD_QUESTIONS, MIN_FLASHCARD_CHARS, args.max_users),
         )
-        users = [(r["user_id"], r["last_failed"]) for r in cur.fetchall()]
-    finally:
-        conn.close()
+        users = [
+            (
+                r["user_id"],
+                r["last_failed"],
+                {"question_count": r["question_count"], "total_chars": r["total_chars"]},
+            )
+            for r in cur.fetchall()
+        ]
 
-    if not users:
-        print("No failed flashcard generation runs found for the given filters.")
-        return 0
+        if not users:
+            print("No retryable failed flashcard generation runs found for the given filters.")
+            return 0
 
-    print(f"Found {len(users)} user(s) with failed runs.")
+        print(f"Found {len(users)} user(s) with retryable failed runs.")
 
-    for user_id, last_failed in users:
-        stats = get_unused_highlight_stats(user_id)
-        active = False
-        conn = get_db_connection()
-        try:
-            ensure_generation_table(conn)
-            active = has_active_generation(conn, user_id)
-        finally:
-            conn.close()
+        eligible: list[int] = []
 
-        print(
-            f"\nuser_id={user_id} last_failed={last_failed} "
-            f"active={active} stats={stats}"
-        )
+        for user_id, last_failed, stats in users:
+            print(f"\nuser_id={user_id} last_failed={last_failed} stats={stats}")
 
-        if active:
-            print("  skip: active generation exists")
-            continue
-        if stats.get("question_count", 0) < MIN_FLASHCARD_QUESTIONS:
-            print(f"  skip: not enough questions (<{MIN_FLASHCARD_QUESTIONS})")
-            continue
-        if stats.get("total_chars", 0) < MIN_FLASHCARD_CHARS:
-            print(f"  skip: not enough chars (<{MIN_FLASHCARD_CHARS})")
-            continue
-
-        if args.dry_run:
-            print(f"  dry-run: would generate (limit={limit}, max_cards={max_cards})")
-            continue
-
-        # Create a new run record for this retry.
-        conn = get_db_connection()
-        try:
-            ensure_generation_table(conn)
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO flashcard_generation_runs (user_id, status, created_at) VALUES (?, ?, ?) RETURNING id",
-                (user_id, "processing", datetime.now().isoformat()),
-            )
-            inserted = cur.fetchone()
-            if not inserted:
-                raise RuntimeError("Failed to create flashcard_generation_runs row.")
-            try:
-                run_id = int(inserted["id"])
-            except Exception:
-                run_id = int(inserted[0])
-            conn.commit()
-        finally:
-            conn.close()
+            if args.dry_run:
+                print(f"  dry-run: would generate (limit={limit}, max_cards={max_cards})")
+                continue
+
+            eligible.append(user_id)
 
+        if not eligible:
+            return 0
+
+        # Each run row is inserted right before its generation, in the same
+        # transaction that records the previous user's outcome: one commit per user,
+        # nobody waits in 'processing' (which has_active_generation treats as a
+        # running job) while other users are served, and a killed batch strands at
+        # most the run in flight. The last outcome is flushed in `finally`.
+        update_sql = "UPDATE flashcard_generation_runs SET status = ?, updated_at = ? WHERE id = ?"
+        pending: tuple[str, str, int] | None = None
         try:
-            resp = run_flashcard_generation(user_id, limit=limit, max_cards=max_cards)
-            print(
-                f"  ok: created={resp.created} highlight_count={resp.highlight_count} "
-                f"flashcard_ids={len(resp.flashcard_ids)}"
-            )
-            conn = get_db_connection()
-            try:
-                mark_generation_status(conn, run_id, "completed")
-            finally:
-                conn.close()
-        except Exception as exc:
-            print(f"  failed: {type(exc).__name__}: {exc}")
-            conn = get_db_connection()
-            try:
-                mark_generation_status(conn, run_id, "failed")
-            finally:
-                conn.close()
+            for user_id in eligible:
+                begin_write()
+                try:
+                    if pending:
+                        cur.execute(update_sql, pending)
+                    cur.execute(
+                        "INSERT INTO flashcard_generation_runs (user_id, status, created_at) VALUES (?, ?, ?) RETURNING id",
+                        (user_id, "processing", datetime.now().isoformat()),
+                    )
+                    inserted = cur.fetchone()
+                    if not inserted:
+                        raise RuntimeError("Failed to create flashcard_generation_runs row.")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                pending = None
+                try:
+                    run_id = int(inserted["id"])
+                except Exception:
+                    run_id = int(inserted[0])
+
+                print(f"\nuser_id={user_id} run_id={run_id}: generating")
+                status = "failed"
+                try:
+                    resp = _call_with_backoff(
+                        lambda: run_flashcard_generation(user_id, limit=limit, max_cards=max_cards)
+                    )
+                    print(
+                        f"  ok: created={resp.created} highlight_count={resp.highlight_count} "
+                        f"flashcard_ids={len(resp.flashcard_ids)}"
+                    )
+                    status = "completed"
+                except Exception as exc:
+                    print(f"  failed: {type(exc).__name__}: {exc}")
+                finally:
+                    # Also reached on KeyboardInterrupt, so the run is marked failed.
+                    pending = (status, datetime.now().isoformat(), run_id)
+        finally:
+            if pending:
+                begin_write()
+                try:
+                    cur.execute(update_sql, pending)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+    finally:
+        conn.close()
 
     return 0
 
@@ -2,59 +2,79 @@ import argparse
 import sys
 import os
 import logging
-from typing import List
+from typing import List, Optional, Set, Tuple
 
 # Add parent dir to path to find new_web_app modules if running from scripts dir
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from new_web_app.core.bulk_generator import BulkGenerator
-from new_web_app.backend import database
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("BulkRunner")
 
-def get_history(topic: str) -> List[str]:
-    """Fetch existing question titles for topic to avoid duplicates."""
-    # This requires database.py to support fetching by topic/tags or just scanning all.
-    # For now, let's try a simple search if available, or just fetch recent.
-    # Database module might not have a clean 'get_titles_by_topic'.
-    # We'll skip complex history fetching for this MVP script or assume empty.
-    return [] 
+def get_history(topic: str) -> Tuple[List[str], Set[str]]:
+    """
+    Fetch existing question titles for topic (for the prompt) plus the
+    normalized question stems (to drop exact repeats before saving).
+    """
+    from new_web_app.backend import database
+    from new_web_app.core.bulk_generator import question_text_key
+
+    rows = database.get_topic_question_history(topic)
+    titles = [r["concept"] for r in rows if r["concept"]]
+    question_keys = {question_text_key(r["question_text"]) for r in rows if r["question_text"]}
+    return titles, question_keys
+
+def _to_db_row(q: dict) -> Optional[dict]:
+    """
+    Shape a BulkGenerator question into the dict database.add_question(s) expects.
+    Returns None when option references don't resolve, so it never reaches the DB.
+    """
+    row = dict(q)
+    id_to_idx = {o.get("id"): i for i, o in enumerate(row.get("options", []))}
+
+    # Add metadata required by DB schema if missing (index derived from option id)
+    if "correct_answer_index" not in row:
+        row["correct_answer_index"] = id_to_idx.get(row.get("correct_option_id"), -1)
+        if row["correct_answer_index"] < 0:
+            logger.error(f"❌ Skipping question: correct option {row.get('correct_option_id')!r} not in options.")
+            return None
+
+    # Map 'explanation' to 'explanation_data' if DB expects it
+    # (BulkGenerator formats it as an 'explanation' dict).
+    if "explanation" in row:
+        row["explanation_data"] = row.pop("explanation")
+
+    # Distractor breakdowns must point at real options.
+    blocks = (row.get("explanation_data") or {}).get("blocks") or []
+    for block in blocks:
+        if isinstance(block, dict) and block.get("type") == "mini_ddx":
+            missing = [
+                item.get("option_id") for item in block.get("items", [])
+                if isinstance(item, dict) and item.get("option_id") not in id_to_idx
+            ]
+            if missing:
+                logger.error(f"❌ Skipping question: explanation references unknown options {missing}.")
+                return None
+    return row
 
 def save_questions(questions: List[dict]):
+    from new_web_app.backend import database
+
+    rows = [r for r in (_to_db_row(q) for q in questions) if r is not None]
+    if not rows:
+        return 0
+
+    # One connection, one transaction for the whole batch.
+    ids = database.add_questions_bulk(rows)
     success_count = 0
-    for q in questions:
-        try:
-            # Add metadata required by DB schema if missing
-            if "correct_answer_index" not in q:
-                # Calculate index from ID
-                opts = q.get("options", [])
-                cid = q.get("correct_option_id")
-                idx = -1
-                for i, o in enumerate(opts):
-                    if o.get("id") == cid:
-                        idx = i
-                        break
-                q["correct_answer_index"] = idx
-
-            # Ensure explanation data is nested correctly
-            # BulkGenerator already formats it as 'explanation' dict.
-            # database.add_question expects dict with flexible fields.
-            # But wait, schema validation might run inside database.add_question?
-            # No, database.py usually valid_llm_output is optional or done before.
-            # Let's check database.py add_question.
-            
-            # Map 'explanation' to 'explanation_data' if DB expects it
-            if "explanation" in q:
-                q["explanation_data"] = q.pop("explanation")
-            
-            qid = database.add_question(q)
+    for qid in ids:
+        if qid:
             logger.info(f"✅ Saved Question ID: {qid}")
             success_count += 1
-        except Exception as e:
-            logger.error(f"❌ Failed to save question: {e}")
-            
+    skipped = len(questions) - success_count
+    if skipped:
+        logger.error(f"❌ {skipped} question(s) not saved (duplicate or insert failure).")
+
     return success_count
 
 def main():
@@ -62,18 +82,22 @@ def main():
     parser.add_argument("--topic", required=True, help="Topic to generate questions for")
     parser.add_argument("--count", type=int, default=10, help="Number of questions")
     parser.add_argument("--source-pdf", dest="source_pdf", help="Absolute path to source PDF")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Always call the LLM; skip the response cache")
     
     args = parser.parse_args()
-    
+
+    # Heavy imports (Gemini SDK, DB layer) only once the arguments are valid.
+    from new_web_app.core.bulk_generator import BulkGenerator
+
     gen = BulkGenerator()
     
     print(f"🚀 Starting Bulk Generation for: {args.topic} ({args.count} questions)")
     if args.source_pdf:
         print(f"📚 Using PDF: {args.source_pdf}")
 
-    history = get_history(args.topic)
+    history, existing_keys = get_history(args.topic)
     
-    questions = gen.generate_bulk(args.topic, count=args.count, offset_history=history, source_pdf=args.source_pdf)
+    questions = gen.generate_bulk(args.topic, count=args.count, offset_history=history, source_pdf=args.source_pdf, use_cache=not args.no_cache, existing_question_keys=existing_keys)
     
     if not questions:
         print("❌ No questions generated.")
@@ -81,6 +105,9 @@ def main():
         
     print(f"📝 Parsed {len(questions)} questions. Saving to DB...")
     saved = save_questions(questions)
+    if saved:
+        # Only a response that produced saved questions is worth replaying.
+        gen.commit_cached_response()
     print(f"🎉 Completed. Saved {saved}/{len(questions)} questions.")
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
 
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
 from google import genai
+import google.auth
+from google.auth.transport.requests import Request
 import os
 
 PROJECT = "project-2e39002d-6c92-451c-940"
@@ -9,32 +15,81 @@ MODELS = ["gemini-1.5-flash-001", "gemini-1.5-flash", "gemini-1.0-pro", "gemini-
 
 print(f"🌍 Starting Exhaustive Scan on {PROJECT}...")
 
-working_config = None
+# Resolve ADC and fetch the OAuth token once; every region client reuses it
+# instead of doing its own credential discovery + token exchange.
+try:
+    CREDENTIALS, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+    CREDENTIALS.refresh(Request())
+except Exception as e:
+    print(f"⚠️ Could not pre-load ADC credentials ({e}); clients will resolve their own.")
+    CREDENTIALS = None
+
+# One client per region, shared by that region's model probes.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(region):
+    with _clients_lock:
+        client = _clients.get(region)
+        if client is None:
+            client = genai.Client(vertexai=True, project=PROJECT, location=region, credentials=CREDENTIALS)
+            _clients[region] = client
+        return client
 
-for region in REGIONS:
-    print(f"\n--- Checking Region: {region} ---")
+
+def probe_sync(region, model):
+    """Returns (region, model, error_or_None)."""
+    try:
+        client = get_client(region)
+    except Exception as e:
+        return region, model, f"Failed to init client for region: {e}"
     try:
-        client = genai.Client(vertexai=True, project=PROJECT, location=region)
-        for model in MODELS:
-            try:
-                print(f"  Probing {model}...", end="", flush=True)
-                response = client.models.generate_content(
-                    model=model,
-                    contents="Hi"
-                )
-                print(f" ✅ SUCCESS!")
-                working_config = (region, model)
-                break
-            except Exception as e:
-                err = str(e)
-                if "404" in err: print(" ❌ 404")
-                elif "403" in err: print(" ❌ 403")
-                else: print(f" ❌ Error: {err[:50]}...")
-        if working_config: break
+        # Only need to know the model answers (vs 404/403), so cap output at 1 token.
+        client.models.generate_content(
+            model=model,
+            contents="ping",
+            config={"max_output_tokens": 1, "temperature": 0.0, "candidate_count": 1},
+        )
+        return region, model, None
     except Exception as e:
-         print(f"  Failed to init client for region: {e}")
+        err = str(e)
+        if "404" in err: return region, model, "404"
+        elif "403" in err: return region, model, "403"
+        else: return region, model, f"Error: {err[:50]}..."
+
+
+async def probe(region, model):
+    return await asyncio.to_thread(probe_sync, region, model)
+
+
+async def main():
+    # Probes are network-bound: start them all, take the first success and
+    # cancel whatever is still pending.
+    jobs = [(region, model) for region in REGIONS for model in MODELS]
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=len(jobs)))
+    pending = {asyncio.create_task(probe(region, model)) for region, model in jobs}
+    working_config = None
+    try:
+        while pending and working_config is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                region, model, error = task.result()
+                if error is None:
+                    print(f"  [{region}] {model} ✅ SUCCESS!")
+                    working_config = (region, model)
+                    break
+                print(f"  [{region}] {model} ❌ {error}")
+    finally:
+        for task in pending:
+            task.cancel()
+
+    # Report before asyncio.run() joins the probe threads that are still in flight.
+    if working_config:
+        print(f"\n🎉 FOUND WORKING CONFIG: Region={working_config[0]}, Model={working_config[1]}")
+    else:
+        print("\n❌ ALL REGIONS/MODELS FAILED.")
+    return working_config
+
 
-if working_config:
-    print(f"\n🎉 FOUND WORKING CONFIG: Region={working_config[0]}, Model={working_config[1]}")
-else:
-    print("\n❌ ALL REGIONS/MODELS FAILED.")
+asyncio.run(main())
@@ -0,0 +1,26 @@
+import sqlite3
+
+# Scan-heavy admin scripts: a 256MB page cache and mmap instead of the 2MB default.
+_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-262144;
+PRAGMA mmap_size=30000000000;
+PRAGMA temp_store=MEMORY;
+"""
+
+
+def connect(path, **kwargs):
+    """sqlite3.connect() with the PRAGMAs shared by the scripts in this directory."""
+    conn = sqlite3.connect(str(path), **kwargs)
+    conn.executescript(_PRAGMAS)
+    return conn
+
+
+def iter_rows(cursor, size=1000):
+    """Yields rows from an executed cursor, size at a time, without fetchall()."""
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        yield from batch
@@ -4,6 +4,18 @@ import json
 import os
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj) -> bytes:
+    """UTF-8 JSON bytes; orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 # Paths
 BASE_DIR = "/home/yusuf-kemal-tuna/medical_quiz_app"
 DB_PATH = os.path.join(BASE_DIR, "shared/data/quiz_v2.db")
@@ -20,23 +32,32 @@ def archive_and_clear():
     c = conn.cursor()
 
     try:
-        # 1. Fetch all questions
+        # 1. Stream questions in batches instead of materializing the whole table
         print("📥 Fetching all questions...")
+        conn.execute("PRAGMA mmap_size=268435456")
+        c.arraysize = 1000
         c.execute("SELECT * FROM questions")
-        rows = c.fetchall()
-        
-        all_questions = [dict(row) for row in rows]
-        print(f"✅ Found {len(all_questions)} questions.")
+        rows = c.fetchmany()
 
-        if not all_questions:
+        if not rows:
             print("⚠️ No questions found. Quitting without deletion.")
             return
 
-        # 2. Write to backup file
+        # 2. Write to backup file incrementally, one JSON object per row
         print(f"💾 Saving to {BACKUP_PATH}...")
-        with open(BACKUP_PATH, 'w', encoding='utf-8') as f:
-            json.dump(all_questions, f, ensure_ascii=False, indent=2)
-        
+        total = 0
+        with open(BACKUP_PATH, 'wb') as f:
+            f.write(b"[\n")
+            while rows:
+                for row in rows:
+                    if total:
+                        f.write(b",\n")
+                    f.write(_dumps(dict(row)))
+                    total += 1
+                rows = c.fetchmany()
+            f.write(b"\n]\n")
+
+        print(f"✅ Found {total} questions.")
         print("✅ Backup completed successfully.")
 
         # 3. Verify backup file exists and has content
@@ -45,11 +66,27 @@ def archive_and_clear():
             return
 
         # 4. Delete questions and reviews
+        # Unqualified DELETEs hit SQLite's truncate optimization (drop + reallocate
+        # pages instead of journaling every row) as long as no triggers or
+        # enforced foreign keys are involved.
         print("🗑️  Deleting all questions and reviews from database...")
-        c.execute("DELETE FROM reviews") # Delete dependent reviews first (though no foreign key constraint enforced usually in sqlite default, good practice)
-        c.execute("DELETE FROM questions")
-        
-        conn.commit()
+        c.execute("PRAGMA foreign_keys=OFF")
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute(
+            "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name IN ('questions', 'reviews')"
+        )
+        triggers = [row[0] for row in c.fetchall()]
+        if triggers:
+            print(f"⚠️ Triggers present ({', '.join(triggers)}); deletes will run row-by-row.")
+
+        c.executescript("PRAGMA temp_store=MEMORY; PRAGMA cache_size=-200000;")
+        # Delete dependent reviews first (though no foreign key constraint enforced usually in sqlite default, good practice)
+        c.executescript("""
+            BEGIN IMMEDIATE;
+            DELETE FROM reviews;
+            DELETE FROM questions;
+            COMMIT;
+        """)
         print("✅ Database cleared.")
         
         # Verify empty
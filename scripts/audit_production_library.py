@@ -18,20 +18,36 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 import sys
 from collections import Counter
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import repeat
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def _normalize_for_match(text: str) -> str:
-    if not text:
-        return ""
-    # Normalize common unicode digits (subscript/superscript) that appear in anatomy PDFs.
-    digit_map = {
+try:
+    from pypdf import PdfReader
+except Exception:
+    try:
+        from PyPDF2 import PdfReader
+    except Exception:
+        PdfReader = None
+
+
+# Normalize common unicode digits (subscript/superscript) that appear in anatomy PDFs,
+# and fold Turkish letters to ASCII, in one str.translate pass.
+_MATCH_TRANSLATION = str.maketrans(
+    {
         "\u2080": "0",  # subscript 0
         "\u2081": "1",  # subscript 1
         "\u2082": "2",  # subscript 2
@@ -52,10 +68,6 @@ def _normalize_for_match(text: str) -> str:
         "\u2077": "7",  # superscript 7
         "\u2078": "8",  # superscript 8
         "\u2079": "9",  # superscript 9
-    }
-    for k, v in digit_map.items():
-        text = text.replace(k, v)
-    tr_map = {
         "\u0131": "i",  # dotless i
         "\u0130": "i",  # dotted I
         "I": "i",
@@ -70,15 +82,25 @@ def _normalize_for_match(text: str) -> str:
         "\u00e7": "c",
         "\u00c7": "c",
     }
-    for k, v in tr_map.items():
-        text = text.replace(k, v)
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize_for_match(text: str) -> str:
+    if not text:
+        return ""
+    text = text.translate(_MATCH_TRANSLATION).lower()
+    # Runs of non-alphanumerics collapse to one space, so only the ends need trimming.
+    return _NON_ALNUM_RE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=8192)
+def _normalize_title(title: str) -> str:
+    # Titles and file stems are short and repeat (pages-wanted plan, filename check, text check).
+    return _normalize_for_match(title)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AuditIssue:
     issue_type: str
     severity: str  # "error" | "warn"
@@ -106,11 +128,55 @@ class AuditIssue:
 
 def _iter_manifests(processed_dir: Path) -> Iterable[Path]:
     # Expected layout: shared/processed_pdfs/<Subject>/<Volume>/manifest.json
-    for manifest in processed_dir.glob("*/*/manifest.json"):
-        yield manifest
+    # scandir's DirEntry.is_dir() uses the cached d_type instead of a stat per entry.
+    try:
+        subjects = list(os.scandir(processed_dir))
+    except OSError:
+        return
+    for subj in subjects:
+        if not subj.is_dir():
+            continue
+        try:
+            volumes = list(os.scandir(subj.path))
+        except OSError:
+            continue
+        for vol in volumes:
+            if not vol.is_dir():
+                continue
+            manifest = os.path.join(vol.path, "manifest.json")
+            if os.path.exists(manifest):
+                yield Path(manifest)
+
+
+def _scan_volume_pdfs(volume_dir: Path, shared_dir: Path) -> set:
+    """
+    All *.pdf under volume_dir, as manifest-style paths relative to shared_dir
+    (processed_pdfs/...). Does not descend into symlinked directories.
+    """
+    try:
+        prefix = str(volume_dir.relative_to(shared_dir)).replace("\\", "/")
+    except Exception:
+        return set()
+    found = set()
+    stack = [(str(volume_dir), prefix)]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            continue
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}"
+            if entry.name.endswith(".pdf"):
+                found.add(rel)
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, rel))
+    return found
 
 
 def _read_json(path: Path) -> Any:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     return json.loads(path.read_text(encoding="utf-8"))
 
 
@@ -121,36 +187,173 @@ def _pdf_open(path: Path):
         raise RuntimeError(
             "PyMuPDF (fitz) not available. Run with venv: ./venv/bin/python scripts/audit_production_library.py"
         ) from e
-    return fitz.open(path)
+    return fitz.open(path, filetype="pdf")
 
 
-def _pdf_page_count(path: Path) -> Optional[int]:
+def _pdf_count_from_trailer(path: Path) -> Optional[int]:
+    """
+    Fast path: read /Root -> /Pages -> /Count without decoding any content stream.
+    Returns None if pypdf is unavailable or the trailer cannot be read.
+    """
+    if PdfReader is None:
+        return None
     try:
-        with _pdf_open(path) as doc:
-            return int(doc.page_count)
+        reader = PdfReader(str(path), strict=False)
+        count = reader.trailer["/Root"]["/Pages"].get("/Count")
+        return int(count) if count is not None else None
     except Exception:
         return None
 
 
-def _pdf_first_pages_text(path: Path, pages: int) -> str:
-    if pages <= 0:
-        return ""
+def _pdf_has_struct_tree(doc) -> bool:
+    try:
+        kind, _value = doc.xref_get_key(doc.pdf_catalog(), "StructTreeRoot")
+        return kind != "null"
+    except Exception:
+        return False
+
+
+def _pdf_pages_text(doc, n: int) -> Tuple[str, ...]:
+    """
+    Text of the first n pages. Tagged PDFs (with a StructTreeRoot) can take seconds per
+    page in get_text(); copying the pages into a scratch document without the structure
+    tree first brings that back to milliseconds. Falls back to direct extraction.
+    """
+    if n <= 0:
+        return ()
+    if _pdf_has_struct_tree(doc):
+        try:
+            import fitz  # PyMuPDF
+
+            with fitz.open() as scratch:
+                scratch.insert_pdf(doc, from_page=0, to_page=n - 1, annots=False, links=False)
+                return tuple(scratch.load_page(i).get_text("text") or "" for i in range(scratch.page_count))
+        except Exception:
+            pass
+    return tuple(doc.load_page(i).get_text("text") or "" for i in range(n))
+
+
+# Cross-run PDF cache: path -> {"mtime_ns", "size", "page_count", "texts"}. None = disabled.
+# Loaded once per process (workers load it themselves); entries read in this process
+# since the last drain are collected in _pdf_cache_updates and merged by the parent.
+_PDF_CACHE_VERSION = 1
+_pdf_cache: Optional[Dict[str, Dict[str, Any]]] = None
+_pdf_cache_updates: Dict[str, Dict[str, Any]] = {}
+
+
+def _load_pdf_cache(cache_path: Optional[Path]) -> None:
+    global _pdf_cache
+    if _pdf_cache is not None or cache_path is None:
+        return
+    entries: Dict[str, Dict[str, Any]] = {}
+    if cache_path.exists():
+        try:
+            data = _read_json(cache_path)
+            if isinstance(data, dict) and data.get("version") == _PDF_CACHE_VERSION:
+                entries = data.get("entries") or {}
+        except Exception:
+            entries = {}
+    _pdf_cache = entries
+
+
+def _flush_pdf_cache(cache_path: Optional[Path]) -> None:
+    """Write the cross-run cache back (atomically) and unload it from this process."""
+    global _pdf_cache
+    if _pdf_cache is None or cache_path is None:
+        return
+    data = {"version": _PDF_CACHE_VERSION, "entries": _pdf_cache}
+    _pdf_cache = None
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
     try:
-        with _pdf_open(path) as doc:
-            n = min(int(doc.page_count), pages)
-            out = []
-            for i in range(n):
-                out.append(doc.load_page(i).get_text("text") or "")
-            return "\n".join(out)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            tmp_path.write_bytes(orjson.dumps(data))
+        else:
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write PDF cache {cache_path}: {e}", file=sys.stderr)
+
+
+def _drain_pdf_cache_updates() -> Dict[str, Dict[str, Any]]:
+    global _pdf_cache_updates
+    updates, _pdf_cache_updates = _pdf_cache_updates, {}
+    return updates
+
+
+def _pdf_read(path: str, want_pages: int) -> Tuple[Optional[int], Tuple[str, ...]]:
+    if want_pages <= 0:
+        page_count = _pdf_count_from_trailer(Path(path))
+        if page_count is not None:
+            return page_count, ()
+    try:
+        with _pdf_open(Path(path)) as doc:
+            page_count = int(doc.page_count)
+            try:
+                texts = _pdf_pages_text(doc, min(page_count, max(want_pages, 0)))
+            except Exception:
+                texts = ()
+            return page_count, texts
     except Exception:
+        return None, ()
+
+
+@lru_cache(maxsize=4096)
+def _pdf_open_once(path: str, want_pages: int) -> Tuple[Optional[int], Tuple[str, ...]]:
+    """
+    Open a PDF once and return (page_count, texts of the first want_pages pages).
+    Memoized per (path, want_pages): callers that need both the page count and the
+    title text for the same file should pass the same want_pages so it is opened once.
+    With the cross-run cache enabled, an unchanged file (same mtime and size) is not
+    opened at all.
+    """
+    if _pdf_cache is None:
+        return _pdf_read(path, want_pages)
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, ()
+    want = max(want_pages, 0)
+    hit = _pdf_cache.get(path)
+    if (
+        hit
+        and hit.get("mtime_ns") == st.st_mtime_ns
+        and hit.get("size") == st.st_size
+        and len(hit.get("texts") or ()) >= min(int(hit["page_count"]), want)
+    ):
+        return int(hit["page_count"]), tuple(hit["texts"][:want])
+
+    page_count, texts = _pdf_read(path, want_pages)
+    if page_count is not None:
+        entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "page_count": page_count, "texts": list(texts)}
+        _pdf_cache[path] = entry
+        _pdf_cache_updates[path] = entry
+    return page_count, texts
+
+
+def _pdf_page_count(path: Path, want_pages: int = 0) -> Optional[int]:
+    return _pdf_open_once(str(path), want_pages)[0]
+
+
+def _pdf_first_pages_text(path: Path, pages: int) -> str:
+    if pages <= 0:
         return ""
+    return "\n".join(_pdf_open_once(str(path), pages)[1])
+
+@lru_cache(maxsize=4096)
+def _pdf_first_pages_norm(path: str, pages: int) -> str:
+    """Normalized first-pages text, built once per PDF however many titles are checked against it."""
+    return _normalize_for_match(_pdf_first_pages_text(Path(path), pages))
 
-def _extract_first_page_preview(path: Path, max_lines: int = 3, max_chars: int = 180) -> str:
+
+def _extract_first_page_preview(path: Path, max_lines: int = 3, max_chars: int = 180, want_pages: int = 1) -> str:
     """
     Best-effort: extract a short, human-readable preview from the first page.
     Used to quickly spot 'wrong chapter inside PDF' cases.
     """
-    raw = _pdf_first_pages_text(path, 1)
+    texts = _pdf_open_once(str(path), max(want_pages, 1))[1]
+    raw = texts[0] if texts else ""
     if not raw:
         return ""
 
@@ -209,102 +412,258 @@ def _rel(path: Path, root: Path) -> str:
         return str(path)
 
 
-def audit(
+def _title_in_filename(title_norm: str, file: str) -> bool:
+    # Extracted sub-segment files are usually named after their title (e.g. 03_kranial_sinirler.pdf).
+    return f" {title_norm} " in f" {_normalize_title(Path(file).stem)} "
+
+
+def _pdf_pages_wanted(segments: List[Any], shared_dir: Path, want_pages: int) -> Dict[str, int]:
+    """
+    Pages of text to read with each PDF a manifest references, so the page-count
+    check and the title check share one _pdf_open_once() call per file. Sub-segments
+    whose file name already carries the title skip the title check and only need
+    the page count.
+    """
+    wanted: Dict[str, int] = {}
+
+    def want(file: str, pages: int) -> None:
+        if file:
+            path = str(shared_dir / file)
+            wanted[path] = max(wanted.get(path, 0), pages)
+
+    for seg in segments:
+        if not isinstance(seg, dict):
+            continue
+        seg_type = (seg.get("type") or "").strip().lower()
+        if seg_type and seg_type != "main":
+            continue
+        want(str(seg.get("file") or ""), want_pages)
+        sub_segments = seg.get("sub_segments", []) or []
+        if not isinstance(sub_segments, list):
+            continue
+        for sub in sub_segments:
+            if not isinstance(sub, dict):
+                continue
+            sub_file = str(sub.get("file") or "")
+            title_norm = _normalize_title(str(sub.get("title") or "")) if want_pages else ""
+            want(sub_file, 0 if title_norm and _title_in_filename(title_norm, sub_file) else want_pages)
+    return wanted
+
+
+def _audit_one_manifest(
+    manifest_path: Path,
+    volume_pdfs: set,
+    shared_dir: Path,
     project_root: Path,
     check_titles: bool,
     title_pages: int,
-    max_manifests: Optional[int],
-    include_orphans: bool,
-) -> Tuple[Dict[str, Any], List[AuditIssue]]:
-    shared_dir = project_root / "shared"
-    processed_dir = shared_dir / "processed_pdfs"
-    reports_dir = project_root / "reports"
+) -> Tuple[Optional[Tuple[str, str]], Optional[set], List[AuditIssue]]:
+    """
+    Audit a single <Subject>/<Volume>/manifest.json. volume_pdfs is the _scan_volume_pdfs()
+    snapshot of its directory, used to answer most file-existence checks without a stat.
 
+    Returns (volume_key, referenced_files, issues); volume_key/referenced_files are None
+    if the manifest could not be read. Kept at module level so it can be shipped to a
+    worker process.
+    """
     issues: List[AuditIssue] = []
 
-    manifest_paths = sorted(_iter_manifests(processed_dir))
-    if max_manifests:
-        manifest_paths = manifest_paths[: max_manifests]
+    subject = manifest_path.parent.parent.name
+    volume = manifest_path.parent.name
+    manifest_rel = _rel(manifest_path, project_root)
 
-    referenced_files_by_volume: Dict[Tuple[str, str], set] = {}
-    disk_pdfs_by_volume: Dict[Tuple[str, str], set] = {}
-
-    # 1) Manifest-level checks
-    for manifest_path in manifest_paths:
-        subject = manifest_path.parent.parent.name
-        volume = manifest_path.parent.name
-        manifest_rel = _rel(manifest_path, project_root)
+    try:
+        manifest = _read_json(manifest_path)
+    except Exception as e:
+        issues.append(
+            AuditIssue(
+                issue_type="manifest_json_error",
+                severity="error",
+                manifest=manifest_rel,
+                subject=subject,
+                volume=volume,
+                details=str(e),
+            )
+        )
+        return None, None, issues
+
+    segments = manifest.get("segments", [])
+    if not isinstance(segments, list):
+        issues.append(
+            AuditIssue(
+                issue_type="manifest_bad_structure",
+                severity="error",
+                manifest=manifest_rel,
+                subject=subject,
+                volume=volume,
+                details="manifest.segments is not a list",
+            )
+        )
+        return None, None, issues
+
+    volume_key = (subject, volume)
+    referenced: set = set()
+    # Page count and title text are read in the same (cached) open of each PDF.
+    text_pages = title_pages if check_titles else 0
+    # PDFs are opened sequentially here: PyMuPDF is not thread-safe, and --workers
+    # already runs one manifest per process.
+    wanted = _pdf_pages_wanted(segments, shared_dir, text_pages)
+
+    def page_count(path: Path) -> Optional[int]:
+        return _pdf_page_count(path, wanted.get(str(path), text_pages))
+
+    for seg in segments:
+        if not isinstance(seg, dict):
+            continue
+        seg_type = (seg.get("type") or "").strip().lower()
+        # Keep non-main types visible: they tend to create phantom UI nodes.
+        if seg_type and seg_type != "main":
+            issues.append(
+                AuditIssue(
+                    issue_type="unknown_segment_type",
+                    severity="warn",
+                    manifest=manifest_rel,
+                    subject=subject,
+                    volume=volume,
+                    segment_title=str(seg.get("title") or ""),
+                    details=f"segment.type={seg_type!r}",
+                )
+            )
+            continue
 
-        try:
-            manifest = _read_json(manifest_path)
-        except Exception as e:
+        seg_title = str(seg.get("title") or "")
+        seg_file = str(seg.get("file") or "")
+        if not seg_file:
             issues.append(
                 AuditIssue(
-                    issue_type="manifest_json_error",
+                    issue_type="segment_missing_file_field",
                     severity="error",
                     manifest=manifest_rel,
                     subject=subject,
                     volume=volume,
-                    details=str(e),
+                    segment_title=seg_title,
+                    details="segment.file is empty",
                 )
             )
             continue
 
-        segments = manifest.get("segments", [])
-        if not isinstance(segments, list):
+        referenced.add(seg_file)
+        seg_path = shared_dir / seg_file
+        if seg_file not in volume_pdfs and not seg_path.exists():
             issues.append(
                 AuditIssue(
-                    issue_type="manifest_bad_structure",
+                    issue_type="missing_pdf",
                     severity="error",
                     manifest=manifest_rel,
                     subject=subject,
                     volume=volume,
-                    details="manifest.segments is not a list",
+                    segment_title=seg_title,
+                    file=seg_file,
+                    details="segment PDF does not exist on disk",
                 )
             )
             continue
 
-        volume_key = (subject, volume)
-        referenced = referenced_files_by_volume.setdefault(volume_key, set())
+        # Segment PDFs are sometimes extracted using pages_raw, sometimes pages_buffered.
+        # Treat mismatch only if it matches neither.
+        seg_expected_raw = _range_len(seg.get("pages_raw") or [])
+        seg_expected_buf = _range_len(seg.get("pages_buffered") or [])
+        seg_actual = page_count(seg_path)
+        if seg_actual and (
+            (seg_expected_raw and seg_actual != seg_expected_raw)
+            and (seg_expected_buf and seg_actual != seg_expected_buf)
+            or ((seg_expected_raw is None) and seg_expected_buf and seg_actual != seg_expected_buf)
+            or ((seg_expected_buf is None) and seg_expected_raw and seg_actual != seg_expected_raw)
+        ):
+            issues.append(
+                AuditIssue(
+                    issue_type="page_count_mismatch",
+                    severity="warn",
+                    manifest=manifest_rel,
+                    subject=subject,
+                    volume=volume,
+                    segment_title=seg_title,
+                    file=seg_file,
+                    details=(
+                        f"segment expected_raw={seg_expected_raw}, expected_buffered={seg_expected_buf}, "
+                        f"actual_pages={seg_actual}"
+                    ),
+                )
+            )
 
-        for seg in segments:
-            if not isinstance(seg, dict):
-                continue
-            seg_type = (seg.get("type") or "").strip().lower()
-            # Keep non-main types visible: they tend to create phantom UI nodes.
-            if seg_type and seg_type != "main":
-                issues.append(
-                    AuditIssue(
-                        issue_type="unknown_segment_type",
-                        severity="warn",
-                        manifest=manifest_rel,
-                        subject=subject,
-                        volume=volume,
-                        segment_title=str(seg.get("title") or ""),
-                        details=f"segment.type={seg_type!r}",
+        if check_titles:
+            title_norm = _normalize_title(seg_title)
+            if title_norm:
+                text_norm = _pdf_first_pages_norm(str(seg_path), title_pages)
+                if text_norm and title_norm not in text_norm:
+                    issues.append(
+                        AuditIssue(
+                            issue_type="title_mismatch",
+                            severity="warn",
+                            manifest=manifest_rel,
+                            subject=subject,
+                            volume=volume,
+                            segment_title=seg_title,
+                            file=seg_file,
+                            details=f"segment title not found in first {title_pages} page(s)",
+                        )
                     )
+
+        sub_segments = seg.get("sub_segments", []) or []
+        if not isinstance(sub_segments, list):
+            issues.append(
+                AuditIssue(
+                    issue_type="segment_bad_sub_segments",
+                    severity="error",
+                    manifest=manifest_rel,
+                    subject=subject,
+                    volume=volume,
+                    segment_title=seg_title,
+                    details="segment.sub_segments is not a list",
                 )
+            )
+            continue
+
+        # Range validation: subsegments are expected to be inside pages_raw range (source-absolute).
+        seg_raw = seg.get("pages_raw", []) or []
+        seg_raw_start = seg_raw[0] if isinstance(seg_raw, list) and len(seg_raw) == 2 else None
+        seg_raw_end = seg_raw[1] if isinstance(seg_raw, list) and len(seg_raw) == 2 else None
+        # Convert the bounds once per segment instead of inside every sub-segment comparison.
+        try:
+            seg_raw_start = int(seg_raw_start) if seg_raw_start is not None else None
+            seg_raw_end = int(seg_raw_end) if seg_raw_end is not None else None
+        except Exception:
+            seg_raw_start = seg_raw_end = None
+
+        # Collect ranges for overlap/gap checks
+        ranges: List[Tuple[int, int, str, str]] = []
+
+        for sub in sub_segments:
+            if not isinstance(sub, dict):
                 continue
+            sub_get = sub.get
+            sub_title = str(sub_get("title") or "")
+            sub_file = str(sub_get("file") or "")
+            sub_pages = sub_get("pages") or ()
 
-            seg_title = str(seg.get("title") or "")
-            seg_file = str(seg.get("file") or "")
-            if not seg_file:
+            if not sub_file:
                 issues.append(
                     AuditIssue(
-                        issue_type="segment_missing_file_field",
+                        issue_type="subsegment_missing_file_field",
                         severity="error",
                         manifest=manifest_rel,
                         subject=subject,
                         volume=volume,
                         segment_title=seg_title,
-                        details="segment.file is empty",
+                        subsegment_title=sub_title,
+                        details="subsegment.file is empty",
                     )
                 )
                 continue
 
-            referenced.add(seg_file)
-            seg_path = shared_dir / seg_file
-            if not seg_path.exists():
+            referenced.add(sub_file)
+            sub_path = shared_dir / sub_file
+            if sub_file not in volume_pdfs and not sub_path.exists():
                 issues.append(
                     AuditIssue(
                         issue_type="missing_pdf",
@@ -313,23 +672,16 @@ def audit(
                         subject=subject,
                         volume=volume,
                         segment_title=seg_title,
-                        file=seg_file,
-                        details="segment PDF does not exist on disk",
+                        subsegment_title=sub_title,
+                        file=sub_file,
+                        details="sub-segment PDF does not exist on disk",
                     )
                 )
                 continue
 
-            # Segment PDFs are sometimes extracted using pages_raw, sometimes pages_buffered.
-            # Treat mismatch only if it matches neither.
-            seg_expected_raw = _range_len(seg.get("pages_raw") or [])
-            seg_expected_buf = _range_len(seg.get("pages_buffered") or [])
-            seg_actual = _pdf_page_count(seg_path)
-            if seg_actual and (
-                (seg_expected_raw and seg_actual != seg_expected_raw)
-                and (seg_expected_buf and seg_actual != seg_expected_buf)
-                or ((seg_expected_raw is None) and seg_expected_buf and seg_actual != seg_expected_buf)
-                or ((seg_expected_buf is None) and seg_expected_raw and seg_actual != seg_expected_raw)
-            ):
+            expected = _range_len(sub_pages)
+            actual = page_count(sub_path)
+            if expected and actual and expected != actual:
                 issues.append(
                     AuditIssue(
                         issue_type="page_count_mismatch",
@@ -338,19 +690,19 @@ def audit(
                         subject=subject,
                         volume=volume,
                         segment_title=seg_title,
-                        file=seg_file,
-                        details=(
-                            f"segment expected_raw={seg_expected_raw}, expected_buffered={seg_expected_buf}, "
-                            f"actual_pages={seg_actual}"
-                        ),
+                        subsegment_title=sub_title,
+                        file=sub_file,
+                        details=f"subsegment expected_pages={expected}, actual_pages={actual}",
                     )
                 )
 
             if check_titles:
-                title_norm = _normalize_for_match(seg_title)
-                if title_norm:
-                    text_norm = _normalize_for_match(_pdf_first_pages_text(seg_path, title_pages))
+                title_norm = _normalize_title(sub_title)
+                # A file name that already spells out the title is taken as a match without opening the PDF.
+                if title_norm and not _title_in_filename(title_norm, sub_file):
+                    text_norm = _pdf_first_pages_norm(str(sub_path), title_pages)
                     if text_norm and title_norm not in text_norm:
+                        preview = _extract_first_page_preview(sub_path, want_pages=text_pages)
                         issues.append(
                             AuditIssue(
                                 issue_type="title_mismatch",
@@ -359,80 +711,86 @@ def audit(
                                 subject=subject,
                                 volume=volume,
                                 segment_title=seg_title,
-                                file=seg_file,
-                                details=f"segment title not found in first {title_pages} page(s)",
+                                subsegment_title=sub_title,
+                                file=sub_file,
+                                details=(
+                                    f"subsegment title not found in first {title_pages} page(s)"
+                                    + (f"; first_page_preview={preview!r}" if preview else "")
+                                ),
                             )
                         )
 
-            sub_segments = seg.get("sub_segments", []) or []
-            if not isinstance(sub_segments, list):
-                issues.append(
-                    AuditIssue(
-                        issue_type="segment_bad_sub_segments",
-                        severity="error",
-                        manifest=manifest_rel,
-                        subject=subject,
-                        volume=volume,
-                        segment_title=seg_title,
-                        details="segment.sub_segments is not a list",
-                    )
-                )
-                continue
-
-            # Range validation: subsegments are expected to be inside pages_raw range (source-absolute).
-            seg_raw = seg.get("pages_raw", []) or []
-            seg_raw_start = seg_raw[0] if isinstance(seg_raw, list) and len(seg_raw) == 2 else None
-            seg_raw_end = seg_raw[1] if isinstance(seg_raw, list) and len(seg_raw) == 2 else None
-
-            # Collect ranges for overlap/gap checks
-            ranges: List[Tuple[int, int, str, str]] = []
-
-            for sub in sub_segments:
-                if not isinstance(sub, dict):
-                    continue
-                sub_title = str(sub.get("title") or "")
-                sub_file = str(sub.get("file") or "")
-                sub_pages = sub.get("pages", []) or []
-
-                if not sub_file:
+            if isinstance(sub_pages, list) and len(sub_pages) == 2:
+                try:
+                    a = int(sub_pages[0])
+                    b = int(sub_pages[1])
+                    ranges.append((a, b, sub_title, sub_file))
+                    if seg_raw_start is not None and a < seg_raw_start:
+                        issues.append(
+                            AuditIssue(
+                                issue_type="subsegment_out_of_range",
+                                severity="warn",
+                                manifest=manifest_rel,
+                                subject=subject,
+                                volume=volume,
+                                segment_title=seg_title,
+                                subsegment_title=sub_title,
+                                file=sub_file,
+                                details=f"subsegment starts before segment.pages_raw start ({a} < {seg_raw_start})",
+                            )
+                        )
+                    if seg_raw_end is not None and b > seg_raw_end:
+                        issues.append(
+                            AuditIssue(
+                                issue_type="subsegment_out_of_range",
+                                severity="warn",
+                                manifest=manifest_rel,
+                                subject=subject,
+                                volume=volume,
+                                segment_title=seg_title,
+                                subsegment_title=sub_title,
+                                file=sub_file,
+                                details=f"subsegment ends after segment.pages_raw end ({b} > {seg_raw_end})",
+                            )
+                        )
+                except Exception:
                     issues.append(
                         AuditIssue(
-                            issue_type="subsegment_missing_file_field",
-                            severity="error",
+                            issue_type="subsegment_bad_pages",
+                            severity="warn",
                             manifest=manifest_rel,
                             subject=subject,
                             volume=volume,
                             segment_title=seg_title,
                             subsegment_title=sub_title,
-                            details="subsegment.file is empty",
+                            file=sub_file,
+                            details=f"subsegment.pages is not a valid [start,end] pair: {sub_pages!r}",
                         )
                     )
-                    continue
 
-                referenced.add(sub_file)
-                sub_path = shared_dir / sub_file
-                if not sub_path.exists():
+        # Overlap / gap checks
+        if ranges:
+            ranges.sort(key=lambda x: (x[0], x[1], x[2]))
+            prev_end = None
+            for (a, b, sub_title, sub_file) in ranges:
+                if prev_end is not None and a <= prev_end:
                     issues.append(
                         AuditIssue(
-                            issue_type="missing_pdf",
-                            severity="error",
+                            issue_type="subsegment_overlap",
+                            severity="warn",
                             manifest=manifest_rel,
                             subject=subject,
                             volume=volume,
                             segment_title=seg_title,
                             subsegment_title=sub_title,
                             file=sub_file,
-                            details="sub-segment PDF does not exist on disk",
+                            details=f"overlap: start={a} <= prev_end={prev_end}",
                         )
                     )
-                    continue
-
-                expected = _range_len(sub_pages)
-                actual = _pdf_page_count(sub_path)
-                if expected and actual and expected != actual:
+                if prev_end is not None and a > prev_end + 1:
                     issues.append(
                         AuditIssue(
-                            issue_type="page_count_mismatch",
+                            issue_type="subsegment_gap",
                             severity="warn",
                             manifest=manifest_rel,
                             subject=subject,
@@ -440,157 +798,127 @@ def audit(
                             segment_title=seg_title,
                             subsegment_title=sub_title,
                             file=sub_file,
-                            details=f"subsegment expected_pages={expected}, actual_pages={actual}",
+                            details=f"gap: start={a} > prev_end+1={prev_end + 1}",
                         )
                     )
+                prev_end = max(prev_end or b, b)
 
-                if check_titles:
-                    title_norm = _normalize_for_match(sub_title)
-                    if title_norm:
-                        text_norm = _normalize_for_match(_pdf_first_pages_text(sub_path, title_pages))
-                        if text_norm and title_norm not in text_norm:
-                            preview = _extract_first_page_preview(sub_path)
-                            issues.append(
-                                AuditIssue(
-                                    issue_type="title_mismatch",
-                                    severity="warn",
-                                    manifest=manifest_rel,
-                                    subject=subject,
-                                    volume=volume,
-                                    segment_title=seg_title,
-                                    subsegment_title=sub_title,
-                                    file=sub_file,
-                                    details=(
-                                        f"subsegment title not found in first {title_pages} page(s)"
-                                        + (f"; first_page_preview={preview!r}" if preview else "")
-                                    ),
-                                )
-                            )
-
-                if isinstance(sub_pages, list) and len(sub_pages) == 2:
-                    try:
-                        a = int(sub_pages[0])
-                        b = int(sub_pages[1])
-                        ranges.append((a, b, sub_title, sub_file))
-                        if seg_raw_start is not None and a < int(seg_raw_start):
-                            issues.append(
-                                AuditIssue(
-                                    issue_type="subsegment_out_of_range",
-                                    severity="warn",
-                                    manifest=manifest_rel,
-                                    subject=subject,
-                                    volume=volume,
-                                    segment_title=seg_title,
-                                    subsegment_title=sub_title,
-                                    file=sub_file,
-                                    details=f"subsegment starts before segment.pages_raw start ({a} < {seg_raw_start})",
-                                )
-                            )
-                        if seg_raw_end is not None and b > int(seg_raw_end):
-                            issues.append(
-                                AuditIssue(
-                                    issue_type="subsegment_out_of_range",
-                                    severity="warn",
-                                    manifest=manifest_rel,
-                                    subject=subject,
-                                    volume=volume,
-                                    segment_title=seg_title,
-                                    subsegment_title=sub_title,
-                                    file=sub_file,
-                                    details=f"subsegment ends after segment.pages_raw end ({b} > {seg_raw_end})",
-                                )
-                            )
-                    except Exception:
-                        issues.append(
-                            AuditIssue(
-                                issue_type="subsegment_bad_pages",
-                                severity="warn",
-                                manifest=manifest_rel,
-                                subject=subject,
-                                volume=volume,
-                                segment_title=seg_title,
-                                subsegment_title=sub_title,
-                                file=sub_file,
-                                details=f"subsegment.pages is not a valid [start,end] pair: {sub_pages!r}",
-                            )
-                        )
-
-            # Overlap / gap checks
-            if ranges:
-                ranges.sort(key=lambda x: (x[0], x[1], x[2]))
-                prev_end = None
-                for (a, b, sub_title, sub_file) in ranges:
-                    if prev_end is not None and a <= prev_end:
-                        issues.append(
-                            AuditIssue(
-                                issue_type="subsegment_overlap",
-                                severity="warn",
-                                manifest=manifest_rel,
-                                subject=subject,
-                                volume=volume,
-                                segment_title=seg_title,
-                                subsegment_title=sub_title,
-                                file=sub_file,
-                                details=f"overlap: start={a} <= prev_end={prev_end}",
-                            )
+            # Coverage heuristic: ranges should start/end at segment.pages_raw
+            try:
+                if seg_raw_start is not None and ranges[0][0] != seg_raw_start:
+                    issues.append(
+                        AuditIssue(
+                            issue_type="subsegment_coverage",
+                            severity="warn",
+                            manifest=manifest_rel,
+                            subject=subject,
+                            volume=volume,
+                            segment_title=seg_title,
+                            details=f"first subsegment start={ranges[0][0]} != segment.pages_raw start={seg_raw_start}",
                         )
-                    if prev_end is not None and a > prev_end + 1:
-                        issues.append(
-                            AuditIssue(
-                                issue_type="subsegment_gap",
-                                severity="warn",
-                                manifest=manifest_rel,
-                                subject=subject,
-                                volume=volume,
-                                segment_title=seg_title,
-                                subsegment_title=sub_title,
-                                file=sub_file,
-                                details=f"gap: start={a} > prev_end+1={prev_end + 1}",
-                            )
+                    )
+                if seg_raw_end is not None and ranges[-1][1] != seg_raw_end:
+                    issues.append(
+                        AuditIssue(
+                            issue_type="subsegment_coverage",
+                            severity="warn",
+                            manifest=manifest_rel,
+                            subject=subject,
+                            volume=volume,
+                            segment_title=seg_title,
+                            details=f"last subsegment end={ranges[-1][1]} != segment.pages_raw end={seg_raw_end}",
                         )
-                    prev_end = max(prev_end or b, b)
+                    )
+            except Exception:
+                pass
 
-                # Coverage heuristic: ranges should start/end at segment.pages_raw
-                try:
-                    if seg_raw_start is not None and ranges[0][0] != int(seg_raw_start):
-                        issues.append(
-                            AuditIssue(
-                                issue_type="subsegment_coverage",
-                                severity="warn",
-                                manifest=manifest_rel,
-                                subject=subject,
-                                volume=volume,
-                                segment_title=seg_title,
-                                details=f"first subsegment start={ranges[0][0]} != segment.pages_raw start={seg_raw_start}",
-                            )
-                        )
-                    if seg_raw_end is not None and ranges[-1][1] != int(seg_raw_end):
-                        issues.append(
-                            AuditIssue(
-                                issue_type="subsegment_coverage",
-                                severity="warn",
-                                manifest=manifest_rel,
-                                subject=subject,
-                                volume=volume,
-                                segment_title=seg_title,
-                                details=f"last subsegment end={ranges[-1][1]} != segment.pages_raw end={seg_raw_end}",
-                            )
-                        )
-                except Exception:
-                    pass
-
-        if include_orphans:
-            # Snapshot disk PDFs for this volume for orphan detection.
-            volume_dir = manifest_path.parent
-            all_pdfs = set()
-            for pdf in volume_dir.rglob("*.pdf"):
-                # Store as manifest-style relative path: processed_pdfs/...
-                try:
-                    rel = pdf.relative_to(shared_dir)
-                    all_pdfs.add(str(rel).replace("\\", "/"))
-                except Exception:
-                    continue
-            disk_pdfs_by_volume[volume_key] = all_pdfs
+    return volume_key, referenced, issues
+
+
+def _audit_manifest_job(
+    manifest_path: Path,
+    volume_pdfs: set,
+    pdf_cache_path: Optional[Path],
+    **kwargs: Any,
+) -> Tuple[Tuple[Optional[Tuple[str, str]], Optional[set], List[AuditIssue]], Dict[str, Dict[str, Any]]]:
+    """Pool entry point: _audit_one_manifest() plus the PDF cache entries it produced."""
+    _load_pdf_cache(pdf_cache_path)
+    result = _audit_one_manifest(manifest_path, volume_pdfs, **kwargs)
+    return result, _drain_pdf_cache_updates()
+
+
+def audit(
+    project_root: Path,
+    check_titles: bool,
+    title_pages: int,
+    max_manifests: Optional[int],
+    include_orphans: bool,
+    workers: int = 1,
+    pdf_cache_path: Optional[Path] = None,
+) -> Tuple[Dict[str, Any], List[AuditIssue]]:
+    shared_dir = project_root / "shared"
+    processed_dir = shared_dir / "processed_pdfs"
+    reports_dir = project_root / "reports"
+
+    issues: List[AuditIssue] = []
+
+    manifest_paths = sorted(_iter_manifests(processed_dir))
+    if max_manifests:
+        manifest_paths = manifest_paths[: max_manifests]
+
+    referenced_files_by_volume: Dict[Tuple[str, str], set] = {}
+    disk_pdfs_by_volume: Dict[Tuple[str, str], set] = {}
+
+    # One scandir walk per volume dir, on threads (readdir/stat I/O releases the GIL). The
+    # snapshot serves both the manifest existence checks and orphan detection. The pool is
+    # joined before the manifest process pool forks, so no thread is live across a fork.
+    with ThreadPoolExecutor(max_workers=8) as scan_executor:
+        volume_pdfs = list(
+            scan_executor.map(_scan_volume_pdfs, [p.parent for p in manifest_paths], repeat(shared_dir))
+        )
+
+    # 1) Manifest-level checks (one self-contained job per volume)
+    _load_pdf_cache(pdf_cache_path)
+    job = partial(
+        _audit_manifest_job,
+        pdf_cache_path=pdf_cache_path,
+        shared_dir=shared_dir,
+        project_root=project_root,
+        check_titles=check_titles,
+        title_pages=title_pages,
+    )
+    if workers <= 1 or len(manifest_paths) <= 1:
+        results = map(job, manifest_paths, volume_pdfs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(job, manifest_paths, volume_pdfs, chunksize=4)
+
+    try:
+        # map() yields in manifest order, so the report stays deterministic.
+        for (volume_key, referenced, manifest_issues), cache_updates in results:
+            if cache_updates and _pdf_cache is not None:
+                _pdf_cache.update(cache_updates)
+            issues.extend(manifest_issues)
+            if volume_key is None:
+                continue
+            referenced_files_by_volume.setdefault(volume_key, set()).update(referenced or ())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        # The per-PDF caches are only valid for this pass; don't carry them into a later audit().
+        _pdf_first_pages_norm.cache_clear()
+        _normalize_title.cache_clear()
+        _pdf_open_once.cache_clear()
+        _drain_pdf_cache_updates()
+        _flush_pdf_cache(pdf_cache_path)
+
+    if include_orphans:
+        for manifest_path, disk_set in zip(manifest_paths, volume_pdfs):
+            volume_key = (manifest_path.parent.parent.name, manifest_path.parent.name)
+            # Only volumes whose manifest could be read take part in orphan checks.
+            if volume_key in referenced_files_by_volume:
+                disk_pdfs_by_volume[volume_key] = disk_set
 
     # 2) Orphan PDF checks per volume
     if include_orphans:
@@ -615,6 +943,7 @@ def audit(
     # 3) medquiz_library.json sanity
     lib_path = shared_dir / "data" / "medquiz_library.json"
     if lib_path.exists():
+        lib_rel = _rel(lib_path, project_root)
         try:
             lib = _read_json(lib_path)
         except Exception as e:
@@ -622,7 +951,7 @@ def audit(
                 AuditIssue(
                     issue_type="library_json_error",
                     severity="error",
-                    manifest=_rel(lib_path, project_root),
+                    manifest=lib_rel,
                     subject="",
                     volume="",
                     details=str(e),
@@ -631,7 +960,11 @@ def audit(
             lib = None
 
         if isinstance(lib, dict):
-            seen_paths = Counter()
+            seen_paths: Dict[str, int] = {}
+            # path -> index of its library_duplicate_path issue, emitted on the second sighting.
+            duplicate_issue_at: Dict[str, int] = {}
+            # Topics often share a PDF; stat each distinct path once.
+            path_exists: Dict[str, bool] = {}
             for source, payload in lib.items():
                 topics = (payload or {}).get("topics", [])
                 if not isinstance(topics, list):
@@ -645,7 +978,7 @@ def audit(
                             AuditIssue(
                                 issue_type="library_missing_path",
                                 severity="warn",
-                                manifest=_rel(lib_path, project_root),
+                                manifest=lib_rel,
                                 subject=source,
                                 volume="",
                                 file="",
@@ -653,26 +986,42 @@ def audit(
                             )
                         )
                         continue
-                    seen_paths[path] += 1
+                    count = seen_paths.get(path, 0) + 1
+                    seen_paths[path] = count
+                    if count == 2:
+                        duplicate_issue_at[path] = len(issues)
+                        issues.append(
+                            AuditIssue(
+                                issue_type="library_duplicate_path",
+                                severity="warn",
+                                manifest=lib_rel,
+                                subject="",
+                                volume="",
+                                file=str(path),
+                                details="path appears 2 times in medquiz_library.json",
+                            )
+                        )
                     if not str(path).startswith("shared/processed_pdfs/"):
                         issues.append(
                             AuditIssue(
                                 issue_type="library_bad_path_prefix",
                                 severity="warn",
-                                manifest=_rel(lib_path, project_root),
+                                manifest=lib_rel,
                                 subject=source,
                                 volume="",
                                 file=str(path),
                                 details="topic path should start with shared/processed_pdfs/",
                             )
                         )
-                    abs_path = project_root / str(path)
-                    if not abs_path.exists():
+                    exists = path_exists.get(path)
+                    if exists is None:
+                        exists = path_exists[path] = (project_root / str(path)).exists()
+                    if not exists:
                         issues.append(
                             AuditIssue(
                                 issue_type="library_missing_pdf",
                                 severity="error",
-                                manifest=_rel(lib_path, project_root),
+                                manifest=lib_rel,
                                 subject=source,
                                 volume="",
                                 file=str(path),
@@ -680,19 +1029,11 @@ def audit(
                             )
                         )
 
-            for path, count in seen_paths.items():
-                if count > 1:
-                    issues.append(
-                        AuditIssue(
-                            issue_type="library_duplicate_path",
-                            severity="warn",
-                            manifest=_rel(lib_path, project_root),
-                            subject="",
-                            volume="",
-                            file=str(path),
-                            details=f"path appears {count} times in medquiz_library.json",
-                        )
-                    )
+            # Only paths seen 3+ times need their count corrected.
+            for path, idx in duplicate_issue_at.items():
+                count = seen_paths[path]
+                if count > 2:
+                    issues[idx] = replace(issues[idx], details=f"path appears {count} times in medquiz_library.json")
 
     summary = {
         "generated_at": datetime.now().isoformat(timespec="seconds"),
@@ -706,6 +1047,33 @@ def audit(
     return summary, issues
 
 
+def _write_report(out_path: Path, summary: Dict[str, Any], issues: List[AuditIssue]) -> None:
+    """
+    Stream {"summary": ..., "issues": [...]} to disk one issue at a time instead of
+    building the whole document in memory. Output matches json.dumps(indent=2).
+    """
+    if orjson is None:
+        payload = {"summary": summary, "issues": [i.to_dict() for i in issues]}
+        with out_path.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+        return
+
+    with out_path.open("wb") as fh:
+        head = orjson.dumps({"summary": summary}, option=orjson.OPT_INDENT_2)
+        fh.write(head[: -len(b"\n}")])
+        if not issues:
+            fh.write(b',\n  "issues": []\n}\n')
+            return
+        fh.write(b',\n  "issues": [')
+        for n, issue in enumerate(issues):
+            # orjson serializes the (slotted) dataclass natively; re-indent it two levels deep.
+            # JSON strings never contain a raw newline, so this only touches layout.
+            body = orjson.dumps(issue, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n    ")
+            fh.write((b",\n    " if n else b"\n    ") + body)
+        fh.write(b"\n  ]\n}\n")
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Audit production library for structural PDF/manifest issues.")
     parser.add_argument("--check-titles", action="store_true", help="Heuristic: verify titles appear in first N pages.")
@@ -716,6 +1084,20 @@ def main() -> int:
         action="store_true",
         help="Report PDFs on disk that are not referenced by manifest.json (can be noisy).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Parallel manifest workers (processes). Use 1 for the sequential path (default: min(cpu, 4)).",
+    )
+    parser.add_argument(
+        "--pdf-cache",
+        type=str,
+        default="",
+        help="Cross-run cache of PDF page counts/title text, keyed by mtime+size "
+        "(default: reports/.audit_pdf_cache.json).",
+    )
+    parser.add_argument("--no-pdf-cache", action="store_true", help="Always re-open every PDF.")
     parser.add_argument(
         "--out",
         type=str,
@@ -726,6 +1108,9 @@ def main() -> int:
 
     project_root = Path(__file__).resolve().parent.parent
     max_manifests = args.max_manifests or None
+    pdf_cache_path: Optional[Path] = None
+    if not args.no_pdf_cache:
+        pdf_cache_path = Path(args.pdf_cache) if args.pdf_cache else (project_root / "reports" / ".audit_pdf_cache.json")
 
     summary, issues = audit(
         project_root=project_root,
@@ -733,15 +1118,13 @@ def main() -> int:
         title_pages=int(args.title_pages),
         max_manifests=max_manifests,
         include_orphans=bool(args.include_orphans),
+        workers=int(args.workers),
+        pdf_cache_path=pdf_cache_path,
     )
 
     out_path = Path(args.out) if args.out else (project_root / "reports" / f"library_audit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "summary": summary,
-        "issues": [i.to_dict() for i in issues],
-    }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    _write_report(out_path, summary, issues)
 
     # Console summary
     print(json.dumps(summary, ensure_ascii=False, indent=2))
@@ -1,7 +1,20 @@
 import sys
 import os
 import time
+import json
 import logging
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# options blobs are parsed once per question; orjson's C parser when available.
+_loads = orjson.loads if orjson is not None else json.loads
 
 sys.path.append("/home/yusuf-kemal-tuna/medical_quiz_app/new_web_app")
 from dotenv import load_dotenv
@@ -9,69 +22,231 @@ load_dotenv("/home/yusuf-kemal-tuna/medical_quiz_app/.env")
 
 from backend import database
 from core.gemini_client import GeminiClient
-from core.deduplicator import save_concept_embedding
+from _db import iter_rows
+
+# Signatures per embed_content request.
+BATCH_SIZE = 100
+# Hard ceiling on requests per rolling minute, whatever the AIMD controller thinks.
+MAX_RPM = int(os.getenv("EMBED_MAX_RPM", "60"))
+# Upper bound for concurrent requests; AIMD decides how many are actually in flight.
+MAX_IN_FLIGHT = int(os.getenv("EMBED_MAX_IN_FLIGHT", "4"))
+# Batches slower than this (seconds) don't earn another concurrent slot.
+TARGET_LATENCY = 5.0
+MAX_ATTEMPTS = 5
+# Rows per fetchmany() when scanning questions.
+FETCH_SIZE = 1000
+
+
+class AimdRateLimiter:
+    """
+    Paces batch requests with additive-increase / multiplicative-decrease:
+    every success raises the request rate by `increase` req/s, every 429 multiplies
+    it by `decrease`. The in-flight limit follows the same rule (+increase per
+    success under target_latency, times `decrease` on 429/5xx). A sliding 60s
+    window also caps requests at max_rpm, and a Retry-After from the server
+    pauses every worker. Shared between worker threads.
+    """
+
+    def __init__(self, rate=0.5, min_rate=0.05, max_rate=5.0, increase=0.5, decrease=0.5, max_rpm=MAX_RPM,
+                 max_in_flight=MAX_IN_FLIGHT, target_latency=TARGET_LATENCY):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_rpm = max_rpm
+        self.limit = 1.0
+        self.max_in_flight = max(1, max_in_flight)
+        self.target_latency = target_latency
+        self._sent = deque()
+        self._last = 0.0
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._pace_lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a concurrency slot is free and the pacing allows a request."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+        self.wait()
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def wait(self):
+        with self._pace_lock:
+            now = time.monotonic()
+            delay = max(self._last + 1.0 / self.rate - now, self._paused_until - now)
+            while self._sent and now - self._sent[0] >= 60.0:
+                self._sent.popleft()
+            if self.max_rpm and len(self._sent) >= self.max_rpm:
+                delay = max(delay, self._sent[0] + 60.0 - now)
+            if delay > 0:
+                time.sleep(delay)
+            self._last = time.monotonic()
+            self._sent.append(self._last)
+
+    def on_success(self, latency):
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            if latency <= self.target_latency:
+                self.limit = min(self.max_in_flight, self.limit + self.increase)
+                self._cond.notify_all()
+
+    def on_throttle(self, retry_after=None):
+        with self._cond:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.limit = max(1.0, self.limit * self.decrease)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    text = str(error)
+    return any(x in text for x in ["429", "RESOURCE_EXHAUSTED", "ResourceExhausted", "Quota"])
+
+
+def _is_retryable(error: Exception) -> bool:
+    text = str(error)
+    return _is_rate_limited(error) or any(x in text for x in ["500", "503", "UNAVAILABLE", "Internal"])
+
+
+def _retry_after(error: Exception):
+    """Seconds from a Retry-After header on the error's HTTP response, if there is one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def embed_batch(client, limiter, signatures):
+    """Returns embeddings for signatures, or None if the batch keeps failing."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            embeddings = client.get_text_embeddings_batch(signatures)
+        except Exception as e:
+            error = e
+        else:
+            limiter.on_success(time.monotonic() - started)
+            return embeddings
+        finally:
+            limiter.release()
+
+        if not _is_retryable(error):
+            print(f"Error embedding batch of {len(signatures)}: {error}")
+            return None
+        limiter.on_throttle(_retry_after(error))
+        print(f"Batch failed (attempt {attempt}/{MAX_ATTEMPTS}): {error}; "
+              f"slowing to {limiter.rate:.2f} req/s, {int(limiter.limit)} in flight")
+        # Full jitter so workers throttled together don't retry together.
+        time.sleep(random.uniform(0, min(30.0, 2 ** attempt)))
+    print(f"Giving up on batch of {len(signatures)} after {MAX_ATTEMPTS} attempts")
+    return None
+
+
+def find_missing_signatures(conn, signatures):
+    """
+    Returns the subset of signatures with no concept_embeddings row, using one
+    anti-join against a TEMP table instead of a lookup per signature.
+    """
+    c = conn.cursor()
+    if database.get_db_engine() == "postgres":
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS backfill_sigs (signature TEXT PRIMARY KEY)")
+    else:
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS backfill_sigs (signature TEXT PRIMARY KEY) WITHOUT ROWID")
+    c.execute("DELETE FROM backfill_sigs")
+    c.executemany(
+        "INSERT INTO backfill_sigs (signature) VALUES (?) ON CONFLICT DO NOTHING",
+        [(sig,) for sig in signatures],
+    )
+    conn.commit()
+    c.execute(
+        """
+        SELECT s.signature
+        FROM backfill_sigs s
+        LEFT JOIN concept_embeddings ce ON ce.concept_text = s.signature
+        WHERE ce.concept_text IS NULL
+        """
+    )
+    return {row[0] for row in c.fetchall()}
+
 
 def backfill():
+    database.ensure_concept_embeddings_table()  # also ensures the concept_text index
     conn = database.get_db_connection()
     c = conn.cursor()
-    
-    # Get all concept tags from questions
-    c.execute("SELECT tags, explanation_data, correct_answer_index, options, question_text, source_material, category FROM questions")
-    rows = c.fetchall()
-    
-    
+
+    # Only the columns the signature needs (explanation_data is large), streamed in
+    # batches so memory stays flat however big the table is.
+    c.execute("SELECT correct_answer_index, options, question_text, category FROM questions")
+
     client = GeminiClient()
-    count = 0
-    updated = 0
-    
-    print(f"Checking {len(rows)} questions for missing embeddings...")
-    
-    for row in rows:
-        tags_raw, explanation_data, correct_idx, options_raw, q_text, source, category = row
-        
+
+    print("Checking questions for missing embeddings...")
+
+    # signature -> topic, first occurrence wins (same signature is only embedded once)
+    signatures = {}
+    total = 0
+    for row in iter_rows(c, FETCH_SIZE):
+        total += 1
+        correct_idx, options_raw, q_text, category = row
+
         # We need to construct the signature "Answer: ... | Question: ..."
         # Extract correct answer text
         try:
-            import json
-            options = json.loads(options_raw) if options_raw else []
+            options = _loads(options_raw) if options_raw else []
             correct_text = ""
             if 0 <= correct_idx < len(options):
                 opt = options[correct_idx]
                 correct_text = opt.get("text", "") if isinstance(opt, dict) else str(opt)
-            
+
             signature = f"Answer: {correct_text} | Question: {q_text}"
-            
+
             # Use topic/category
             topic = category # Fallback
-            
-            # Check if embedding exists for this EXACT signature
-            c.execute("SELECT 1 FROM concept_embeddings WHERE concept_text = ?", (signature,))
-            if c.fetchone():
-                print(f"Skipping (Already exists): {signature[:50]}...")
-                continue
 
-            # Check if concept (old style) exists? 
-            # If so, we might want to update it to new signature? 
-            # Yes, save_concept_embedding does INSERT OR REPLACE.
-            
-            # Rate limit protection (Increased to avoid 429)
-            time.sleep(2.0) 
-            
-            emb = client.get_text_embedding(signature)
-            if emb:
-                # This will overwrite if primary key matches (concept, topic)
-                # If signature changed (added Answer: ...), it's a new row?
-                # The table PK is usually (topic, concept).
-                # If "concept" column holds the signature string, then a new signature = new row.
-                # Old signature (just concept text) remains as a zombie row or valid alias.
-                save_concept_embedding(topic, signature, emb)
-                updated += 1
-                if updated % 10 == 0:
-                    print(f"Updated {updated} embeddings...")
-            
+            # If "concept" column holds the signature string, then a new signature = new row.
+            # Old signature (just concept text) remains as a zombie row or valid alias.
+            signatures.setdefault(signature, topic)
+
         except Exception as e:
             print(f"Error processing row: {e}")
-            
+
+    print(f"Read {total} questions, {len(signatures)} distinct signatures.")
+    missing = find_missing_signatures(conn, signatures)
+    conn.close()
+    print(f"Skipping {len(signatures) - len(missing)} signatures that already have embeddings.")
+    pending = {sig: topic for sig, topic in signatures.items() if sig in missing}
+
+    print(f"{len(pending)} signatures need embeddings ({BATCH_SIZE} per request).")
+    limiter = AimdRateLimiter()
+    items = list(pending.items())
+    batches = [items[start:start + BATCH_SIZE] for start in range(0, len(items), BATCH_SIZE)]
+    updated = 0
+    # Requests run on worker threads; writes stay on this thread, one transaction per batch.
+    with ThreadPoolExecutor(max_workers=limiter.max_in_flight) as pool:
+        futures = {
+            pool.submit(embed_batch, client, limiter, [sig for sig, _ in batch]): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            embeddings = future.result()
+            if not embeddings:
+                continue
+            updated += database.save_concept_embeddings(
+                [(topic, sig, emb) for (sig, topic), emb in zip(batch, embeddings) if emb]
+            )
+            print(f"Updated {updated} embeddings...")
+
     print(f"Backfill complete. Updated {updated} signatures.")
 
 if __name__ == "__main__":
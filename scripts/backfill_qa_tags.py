@@ -10,6 +10,7 @@ sys.path.append(str(PROJECT_ROOT))
 sys.path.append(str(PROJECT_ROOT / "new_web_app"))
 
 from new_web_app.backend import database
+from _db import connect, iter_rows
 
 DB_PATH = PROJECT_ROOT / "shared" / "data" / "quiz_v2.db"
 
@@ -19,18 +20,35 @@ def backfill_qa_tags(dry_run: bool = True) -> None:
         print(f"DB not found: {DB_PATH}")
         return
 
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
+    if not dry_run:
+        # Hold the write lock from read to write so the tags we rewrite can't change underneath us.
+        conn.execute("BEGIN IMMEDIATE")
+
     c.execute("SELECT id, question_text, options, correct_answer_index, tags FROM questions")
-    rows = c.fetchall()
 
     updated = 0
     skipped = 0
-
-    for row in rows:
-        tags = database.safe_json_parse(row["tags"], [])
+    total = 0
+    # JSON arrays get the tag appended in SQLite (json_insert) instead of being
+    # re-encoded here; empty or legacy non-JSON tags are rewritten in full.
+    appends = []
+    rewrites = []
+
+    # Stream the scan instead of fetchall() so memory stays at one batch of rows.
+    for row in iter_rows(c):
+        total += 1
+        raw_tags = row["tags"]
+        try:
+            tags = json.loads(raw_tags) if raw_tags else None
+        except json.JSONDecodeError:
+            tags = None
+        in_place = isinstance(tags, list)
+        if not in_place:
+            tags = database.safe_json_parse(raw_tags, [])
         qa_tag = database.build_qa_tag(
             row["question_text"],
             row["options"],
@@ -49,19 +67,26 @@ def backfill_qa_tags(dry_run: bool = True) -> None:
         tags.append(qa_tag)
         updated += 1
 
-        if not dry_run:
-            c.execute(
-                "UPDATE questions SET tags = ? WHERE id = ?",
-                (json.dumps(tags, ensure_ascii=False), row["id"])
-            )
+        if dry_run:
+            continue
+        if in_place:
+            appends.append((qa_tag, row["id"]))
+        else:
+            rewrites.append((json.dumps(tags, ensure_ascii=False), row["id"]))
 
     if not dry_run:
-        conn.commit()
+        try:
+            c.executemany("UPDATE questions SET tags = json_insert(tags, '$[#]', ?) WHERE id = ?", appends)
+            c.executemany("UPDATE questions SET tags = ? WHERE id = ?", rewrites)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
     conn.close()
 
     mode = "DRY RUN" if dry_run else "APPLIED"
-    print(f"{mode}: updated={updated}, skipped={skipped}, total={len(rows)}")
+    print(f"{mode}: updated={updated}, skipped={skipped}, total={total}")
 
 
 if __name__ == "__main__":
@@ -1,16 +1,27 @@
-import sqlite3
 import os
-import pandas as pd
-from tabulate import tabulate
+from collections import Counter
+
+from _db import connect
 
 DB_PATH = "shared/data/quiz_v2.db"
 
+def format_table(headers, rows):
+    """psql-style grid, sized to the widest cell in each column."""
+    cells = [["" if v is None else str(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in cells]) for i, h in enumerate(headers)]
+    rule = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+
+    def line(values):
+        return "| " + " | ".join(v.ljust(w) for v, w in zip(values, widths)) + " |"
+
+    return "\n".join([rule, line(headers), rule] + [line(r) for r in cells] + [rule])
+
 def check_feedback():
     if not os.path.exists(DB_PATH):
         print(f"Database not found at {DB_PATH}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     
     # Read feedback with context (optional: join with questions to get question text)
     query = '''
@@ -29,17 +40,20 @@ def check_feedback():
     '''
     
     try:
-        df = pd.read_sql_query(query, conn)
-        if df.empty:
+        cursor = conn.execute(query)
+        rows = cursor.fetchall()
+        if not rows:
             print("No feedback found.")
         else:
-            print(f"\nFound {len(df)} feedback items:\n")
+            print(f"\nFound {len(rows)} feedback items:\n")
             # Format display
-            print(tabulate(df, headers='keys', tablefmt='psql', showindex=False))
+            headers = [col[0] for col in cursor.description]
+            print(format_table(headers, rows))
             
             # Summary by type
             print("\nSummary by Type:")
-            print(df['feedback_type'].value_counts())
+            for feedback_type, count in Counter(r[2] for r in rows).most_common():
+                print(f"{feedback_type}: {count}")
             
     except Exception as e:
         print(f"Error reading feedback: {e}")
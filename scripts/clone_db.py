@@ -1,4 +1,3 @@
-import shutil
 import os
 import sqlite3
 import sys
@@ -23,38 +22,22 @@ def clone_database():
             sys.exit(0)
 
     try:
-        # Perform file copy
-        shutil.copy2(SOURCE_DB, TARGET_DB)
-        print(f"✅ Database copied successfully.")
-        
-        # Verify Integrity
+        # Online backup: copies pages under a read lock, so a live source (with
+        # un-checkpointed WAL) still yields a consistent snapshot, unlike a file copy.
         conn_src = sqlite3.connect(SOURCE_DB)
         conn_tgt = sqlite3.connect(TARGET_DB)
-        
-        cursor_src = conn_src.cursor()
-        cursor_tgt = conn_tgt.cursor()
-        
-        # Check Table Counts as a proxy for integrity
-        tables = ["questions", "reviews", "users", "user_highlights"]
-        
+
+        def progress(status, remaining, total):
+            print(f"   {total - remaining}/{total} pages copied", end="\r")
+
+        conn_src.backup(conn_tgt, pages=1000, progress=progress)
+        print(f"\n✅ Database copied successfully.")
+
+        # Verify Integrity
         print("\n🔍 Verifying Data Integrity:")
-        all_good = True
-        
-        for table in tables:
-            try:
-                cursor_src.execute(f"SELECT COUNT(*) FROM {table}")
-                count_src = cursor_src.fetchone()[0]
-                
-                cursor_tgt.execute(f"SELECT COUNT(*) FROM {table}")
-                count_tgt = cursor_tgt.fetchone()[0]
-                
-                match = "✅ Match" if count_src == count_tgt else "❌ MISMATCH"
-                print(f"   - {table}: {count_src} -> {count_tgt} [{match}]")
-                
-                if count_src != count_tgt:
-                    all_good = False
-            except sqlite3.OperationalError:
-                print(f"   - {table}: Table missing in source (Skipping)")
+        result = conn_tgt.execute("PRAGMA quick_check").fetchone()[0]
+        all_good = result == "ok"
+        print(f"   - quick_check: {result}")
 
         conn_src.close()
         conn_tgt.close()
@@ -62,7 +45,7 @@ def clone_database():
         if all_good:
             print("\n🎉 Clone Success! You may now safely develop on 'quiz_v2.db'.")
         else:
-            print("\n⚠️  Clone Integrity Warning! Check mismatches.")
+            print("\n⚠️  Clone Integrity Warning! Check quick_check output.")
 
     except Exception as e:
         print(f"\n❌ Error during cloning: {e}")
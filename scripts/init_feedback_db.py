@@ -1,6 +1,7 @@
-import sqlite3
 import os
 
+from _db import connect
+
 DB_PATH = "shared/data/quiz_v2.db"
 
 def init_db():
@@ -8,7 +9,7 @@ def init_db():
         print(f"Database not found at {DB_PATH}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     
     print("Creating question_feedback table...")
@@ -1,24 +1,28 @@
-import sqlite3
 import json
 
+from _db import connect
+
 DB_PATH = "shared/data/quiz_v2.db"
 
-with sqlite3.connect(DB_PATH) as conn:
+# Filter in SQLite (JSON1) so only matching header arrays come back to Python.
+# Rows whose explanation_data is empty or not valid JSON are skipped, as before.
+QUERY = """
+    SELECT q.id, json_extract(b.value, '$.headers')
+    FROM questions q,
+         json_each(CASE WHEN json_valid(q.explanation_data) THEN q.explanation_data ELSE '{}' END, '$.blocks') b
+    WHERE json_extract(b.value, '$.type') = 'table'
+      AND EXISTS (
+          SELECT 1 FROM json_each(b.value, '$.headers') h
+          WHERE instr(h.value, 'Tanı') > 0
+      )
+    ORDER BY q.rowid, b.key
+"""
+
+with connect(DB_PATH) as conn:
     cursor = conn.cursor()
-    cursor.execute("SELECT id, explanation_data FROM questions")
+    cursor.execute(QUERY)
     printed = 0
-    for question_id, raw in cursor:
-        if not raw:
-            continue
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        for block in data.get("blocks", []):
-            if block.get("type") != "table":
-                continue
-            headers = block.get("headers", [])
-            if any("Tanı" in header for header in headers):
-                print(question_id, headers)
-                printed += 1
+    for question_id, headers in cursor:
+        print(question_id, json.loads(headers))
+        printed += 1
     print(f"Total tables with 'Tanı' in headers: {printed}")
@@ -9,21 +9,37 @@ NOW WITH HIERARCHY SUPPORT: Assigns 'category' from TOC.
 import os
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PAGE_COUNT_CACHE_NAME = ".page_count_cache.json"
+
+_TR_SLUG = str.maketrans({
+    'ı': 'i', 'İ': 'i', 'ğ': 'g', 'Ğ': 'g', 'ü': 'u', 'Ü': 'u',
+    'ş': 's', 'Ş': 's', 'ö': 'o', 'Ö': 'o', 'ç': 'c', 'Ç': 'c'
+})
+_RE_NONWORD = re.compile(r'[^\w\s-]')
+_RE_SEP = re.compile(r'[-\s]+')
+_RE_TRAILING_NUM = re.compile(r'\d+$')
+_RE_TOC = re.compile(r'^(.*?)(?:\.{2,}|\s{2,})(\d+)$')
+
 def slugify(value):
     """
     Converts string to slug (matching split_by_toc.py logic).
     """
-    value = str(value)
-    tr_map = {
-        'ı': 'i', 'İ': 'i', 'ğ': 'g', 'Ğ': 'g', 'ü': 'u', 'Ü': 'u', 
-        'ş': 's', 'Ş': 's', 'ö': 'o', 'Ö': 'o', 'ç': 'c', 'Ç': 'c'
-    }
-    for k, v in tr_map.items():
-        value = value.replace(k, v)
-    value = re.sub(r'[^\w\s-]', '', value).strip().lower()
-    value = re.sub(r'[-\s]+', '_', value)
+    value = str(value).translate(_TR_SLUG)
+    value = _RE_NONWORD.sub('', value).strip().lower()
+    value = _RE_SEP.sub('_', value)
     return value
 
 def parse_toc_hierarchy(toc_path):
@@ -50,7 +66,7 @@ def parse_toc_hierarchy(toc_path):
             i += 1
             continue
             
-        has_dots_or_num = ("..." in line or ". . ." in line) or re.search(r'\d+$', line)
+        has_dots_or_num = ("..." in line or ". . ." in line) or _RE_TRAILING_NUM.search(line)
         
         # Check strict uppercase for category (allowing common conjunctions)
         temp_cat = line.replace(" VE ", " ").replace(" İLE ", " ").replace(" VEYA ", " ")
@@ -93,7 +109,7 @@ def parse_toc_hierarchy(toc_path):
             hierarchy_map[cat_slug] = current_category
         else:
             # Extract topic name
-            match = re.search(r'^(.*?)(?:\.{2,}|\s{2,})(\d+)$', line)
+            match = _RE_TOC.search(line)
             if match:
                 raw_name = match.group(1).strip()
             else:
@@ -114,8 +130,13 @@ def parse_toc_hierarchy(toc_path):
 def get_title_from_file(filepath):
     """Read the first line of the file to extract the title."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            first_line = f.readline().strip()
+        # Only the first line is needed: read a small binary prefix instead of a
+        # text-mode buffer, finishing the line only if it is longer than that.
+        with open(filepath, 'rb') as f:
+            head = f.read(512)
+            if b'\n' not in head and b'\r' not in head:
+                head += f.readline()
+            first_line = head.split(b'\n', 1)[0].split(b'\r', 1)[0].decode('utf-8').strip()
             # Remove '# ' prefix if present (markdown header)
             if first_line.startswith('# '):
                 title = first_line[2:].strip()
@@ -128,7 +149,59 @@ def get_title_from_file(filepath):
         print(f"Error reading {filepath}: {e}")
         return None
 
-def rebuild_index(base_dir='preprocessed_chunks', pdf_dir='shared/processed_pdfs', output_file='shared/data/medquiz_library.json'):
+def load_page_count_cache(cache_path):
+    """Returns {rel_path: [mtime_ns, size, page_count]} from the last run, or {}."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_page_count_cache(cache_path, cache):
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write page count cache {cache_path}: {e}")
+
+def read_page_count(path):
+    """Returns (page_count, error); runs in worker processes, so errors come back as text."""
+    try:
+        doc = fitz.open(path)
+        page_count = doc.page_count
+        doc.close()
+        return page_count, None
+    except Exception as e:
+        return 0, str(e)
+
+def iter_pdf_entries(directory):
+    """
+    Yields DirEntry objects for the PDFs under directory, in os.walk order
+    (a directory's files before its subdirectories, symlinked dirs not followed).
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+        elif entry.name.lower().endswith('.pdf'):
+            yield entry
+    for subdir in subdirs:
+        yield from iter_pdf_entries(subdir)
+
+def rebuild_index(base_dir='preprocessed_chunks', pdf_dir='shared/processed_pdfs', output_file='shared/data/medquiz_library.json', workers=None):
     library = {}
     base_path = Path(base_dir)
     pdf_path = Path(pdf_dir)
@@ -166,6 +239,13 @@ def rebuild_index(base_dir='preprocessed_chunks', pdf_dir='shared/processed_pdfs
             hierarchy = {}
             if toc_path.exists():
                 hierarchy = parse_toc_hierarchy(toc_path)
+            # Longest slug first, so the first substring hit is the best match
+            # (sorted() is stable: equal lengths keep TOC order, as before).
+            slugs_by_len = sorted(
+                ((t_slug, cat) for t_slug, cat in hierarchy.items() if t_slug),
+                key=lambda item: len(item[0]),
+                reverse=True,
+            )
             
             topics = []
             
@@ -184,11 +264,10 @@ def rebuild_index(base_dir='preprocessed_chunks', pdf_dir='shared/processed_pdfs
                 category = "Genel" 
                 f_slug = file_path.stem.lower() 
                 
-                best_match_len = 0
-                for t_slug, cat in hierarchy.items():
-                    if t_slug in f_slug and len(t_slug) > best_match_len:
-                         category = cat
-                         best_match_len = len(t_slug)
+                for t_slug, cat in slugs_by_len:
+                    if t_slug in f_slug:
+                        category = cat
+                        break
                 
                 topics.append({
                     "topic": title,
@@ -207,6 +286,14 @@ def rebuild_index(base_dir='preprocessed_chunks', pdf_dir='shared/processed_pdfs
                 }
 
     # --- 2. Scan Processed PDFs (New Semantic Chapters) ---
+    # Page counts are reused from the last run for PDFs whose mtime/size are unchanged.
+    page_count_cache_path = os.path.join(os.path.dirname(output_file), PAGE_COUNT_CACHE_NAME)
+    old_page_counts = load_page_count_cache(page_count_cache_path)
+    page_counts = {}
+    # (topic entry, rel_path, path, stat) for PDFs that need fitz; parsed after the walk.
+    page_count_misses = []
+    if pdf_path.exists() and fitz is None:
+        print("Error: fitz (PyMuPDF) not found for page counting.")
     if pdf_path.exists():
         print(f"Scanning PDF Directory: {pdf_path}")
         for source_dir in sorted(pdf_path.iterdir()):
@@ -228,70 +315,93 @@ def rebuild_index(base_dir='preprocessed_chunks', pdf_dir='shared/processed_pdfs
             
             # Recursive Walk
             # Structure: processed_pdfs/{Subject}/output_{...}/[sub|main]/{Category}/{Topic}.pdf
-            for root, dirs, files in os.walk(source_dir):
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        full_path = Path(root) / file
-                        
-                        # Determine Category and Topic from Path
-                        # Example path: .../sub/01_Hucre_Zedelenmesi/02_Adaptasyon.pdf
-                        # Category: 01_Hucre_Zedelenmesi
-                        # Topic: 02_Adaptasyon
-                        
-                        parent_folder = full_path.parent.name
-                        grandparent_folder = full_path.parent.parent.name
-                        
-                        # Logic to clean names
-                        # If parent is 'sub' or 'main', then category is likely just "Genel" or derived from grandparent?
-                        # Actually structure is: output_X / sub / CategoryName / File.pdf
-                        
-                        if parent_folder in ['sub', 'main']:
-                            # File is directly in sub/main? Usually not based on structure description.
-                            # Structure: output.../main/Chapter.pdf
-                            category = "Ana Bölümler" if parent_folder == 'main' else "Alt Bölümler"
-                        else:
-                            # Parent is likely the Category Name (e.g. SANTRAL_SINIR_SISTEMI)
-                            category = parent_folder.replace('_', ' ').title()
-                        
-                        # Topic Name from Filename
-                        topic_name = file.replace('.pdf', '').replace('_', ' ')
-                        # Remove leading numbers if present (e.g. "01 Topic" -> "Topic")
-                        # topic_name = re.sub(r'^\d+\s*', '', topic_name) 
-                        
-                        # Relative path for storage? Or Absolute?
-                        # Library usually stores relative to app root.
-                        rel_path = str(full_path.relative_to(root_dir))
-                        
-                        # Get Page Count
-                        page_count = 0
-                        try:
-                            # Use PyMuPDF (fitz) as it is available
-                            import fitz
-                            doc = fitz.open(full_path)
-                            page_count = doc.page_count
-                            doc.close()
-                        except ImportError:
-                            print("Error: fitz (PyMuPDF) not found for page counting.")
-                        except Exception as e:
-                            print(f"Error reading PDF {file}: {e}")
+            for entry in iter_pdf_entries(source_dir):
+                file = entry.name
+                full_path = Path(entry.path)
+                
+                # Determine Category and Topic from Path
+                # Example path: .../sub/01_Hucre_Zedelenmesi/02_Adaptasyon.pdf
+                # Category: 01_Hucre_Zedelenmesi
+                # Topic: 02_Adaptasyon
+                
+                parent_folder = full_path.parent.name
+                grandparent_folder = full_path.parent.parent.name
+                
+                # Logic to clean names
+                # If parent is 'sub' or 'main', then category is likely just "Genel" or derived from grandparent?
+                # Actually structure is: output_X / sub / CategoryName / File.pdf
+                
+                if parent_folder in ['sub', 'main']:
+                    # File is directly in sub/main? Usually not based on structure description.
+                    # Structure: output.../main/Chapter.pdf
+                    category = "Ana Bölümler" if parent_folder == 'main' else "Alt Bölümler"
+                else:
+                    # Parent is likely the Category Name (e.g. SANTRAL_SINIR_SISTEMI)
+                    category = parent_folder.replace('_', ' ').title()
+                
+                # Topic Name from Filename
+                topic_name = file.replace('.pdf', '').replace('_', ' ')
+                # Remove leading numbers if present (e.g. "01 Topic" -> "Topic")
+                # topic_name = re.sub(r'^\d+\s*', '', topic_name) 
+                
+                # Relative path for storage? Or Absolute?
+                # Library usually stores relative to app root.
+                rel_path = str(full_path.relative_to(root_dir))
+                
+                # Get Page Count
+                topic = {
+                    "topic": topic_name,
+                    "file": file,
+                    "path": rel_path,
+                    "category": category,
+                    "type": "pdf",
+                    "page_count": 0
+                }
+                try:
+                    st = entry.stat()
+                    cached = old_page_counts.get(rel_path)
+                    if cached and cached[:2] == [st.st_mtime_ns, st.st_size]:
+                        topic["page_count"] = cached[2]
+                        page_counts[rel_path] = cached
+                    elif fitz is not None:
+                        page_count_misses.append((topic, rel_path, str(full_path), st))
+                except Exception as e:
+                    print(f"Error reading PDF {file}: {e}")
 
-                        pdf_topics.append({
-                            "topic": topic_name,
-                            "file": file,
-                            "path": rel_path,
-                            "category": category,
-                            "type": "pdf",
-                            "page_count": page_count
-                        })
-            
+                pdf_topics.append(topic)
+    
             if pdf_topics:
                 print(f"  Found {len(pdf_topics)} PDFs for {source_name}")
                 library[source_name]["topics"].extend(pdf_topics)
                 library[source_name]["topic_count"] += len(pdf_topics)
 
+    # fitz.open is CPU-bound and every PDF is independent: parse cache misses in parallel.
+    if page_count_misses:
+        paths = [path for _, _, path, _ in page_count_misses]
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+                results = list(pool.map(read_page_count, paths, chunksize=16))
+        else:
+            results = [read_page_count(path) for path in paths]
+        for (topic, rel_path, _, st), (page_count, error) in zip(page_count_misses, results):
+            if error:
+                print(f"Error reading PDF {topic['file']}: {error}")
+                continue
+            topic["page_count"] = page_count
+            page_counts[rel_path] = [st.st_mtime_ns, st.st_size, page_count]
+
+    if page_counts:
+        save_page_count_cache(page_count_cache_path, page_counts)
+
     # Write the JSON output
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(library, f, ensure_ascii=False, indent=2)
+    # orjson's indent=2 output is byte-identical to json.dump(..., ensure_ascii=False, indent=2).
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(library, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(library, f, ensure_ascii=False, indent=2)
         
     print(f"\nSuccessfully rebuilt library index at {output_file}")
     print(f"Total sources: {len(library)}")
@@ -19,16 +19,23 @@ import argparse
 import contextlib
 import sqlite3
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
-from typing import Iterable
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent  # -> medical_quiz_app
 DEFAULT_DB_PATH = PROJECT_ROOT / "shared" / "data" / "quiz_v2.db"
 PAUSE_FLAG_PATH = PROJECT_ROOT / "generation_paused.flag"
 
+# Rows deleted per write transaction, and the pause between transactions.
+DEFAULT_BLOCK_SIZE = 500
+DEFAULT_BLOCK_SLEEP_MS = 50
+# Attempts per block when the worker still holds the lock after busy_timeout.
+LOCK_RETRIES = 5
+
 
 @dataclass(frozen=True)
 class Segment:
@@ -36,20 +43,21 @@ class Segment:
     main_header: str
 
 
-def _chunked(values: list[int], chunk_size: int = 900) -> Iterable[list[int]]:
-    for i in range(0, len(values), chunk_size):
-        yield values[i : i + chunk_size]
-
-
-def _now_ts() -> str:
-    # Matches the general format used elsewhere in the app.
-    return datetime.now().isoformat(sep=" ", timespec="microseconds")
-
-
-def _connect(db_path: Path) -> sqlite3.Connection:
+def _connect(db_path: Path, *, tune: bool = True) -> sqlite3.Connection:
     conn = sqlite3.connect(str(db_path), timeout=60)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA busy_timeout = 60000")
+    if tune:
+        # WAL keeps the job worker's reads going while we write; NORMAL drops the
+        # fsync per commit, which dominates with many small delete transactions.
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA wal_autocheckpoint = 1000")
+    # Lets SQLite run ON DELETE CASCADE for dependents whose schema declares it.
+    conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
 
@@ -89,19 +97,114 @@ def _fetch_int(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> int:
     return int(row[0]) if row and row[0] is not None else 0
 
 
-def _fetch_ids(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> list[int]:
-    return [int(r[0]) for r in conn.execute(sql, params).fetchall()]
+# Tables holding rows that belong to a question (table, column referencing questions.id).
+QUESTION_DEPENDENTS = (
+    ("reviews", "question_id"),
+    ("question_feedback", "question_id"),
+    ("content_feedback", "question_id"),
+    ("extended_explanations", "question_id"),
+    ("visual_explanations", "question_id"),
+    ("question_topic_links", "question_id"),
+)
+
+
+def _cascading_tables(conn: sqlite3.Connection, parent: str) -> set[str]:
+    """Tables with a foreign key to `parent` declared ON DELETE CASCADE."""
+    rows = conn.execute(
+        """
+        SELECT m.name
+        FROM sqlite_master m, pragma_foreign_key_list(m.name) f
+        WHERE m.type = 'table' AND f."table" = ? AND upper(f.on_delete) = 'CASCADE'
+        """,
+        (parent,),
+    ).fetchall()
+    return {str(r[0]) for r in rows}
+
+
+# Rows of a segment, as subqueries taking (source_material, category_like), so every
+# count and delete is a single statement and no id list is built in Python.
+SEGMENT_QUESTIONS = "SELECT id FROM questions WHERE source_material = ? AND category LIKE ?"
+SEGMENT_HIGHLIGHTS = f"SELECT id FROM user_highlights WHERE question_id IN ({SEGMENT_QUESTIONS})"
+
+
+def _count_in(conn: sqlite3.Connection, table: str, column: str, subquery: str, params: tuple) -> int:
+    return _fetch_int(conn, f"SELECT COUNT(*) FROM {table} WHERE {column} IN ({subquery})", params)
+
+
+def _has_leading_index(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    for index in conn.execute("SELECT name FROM pragma_index_list(?)", (table,)).fetchall():
+        first = conn.execute("SELECT name FROM pragma_index_info(?) WHERE seqno = 0", (index[0],)).fetchone()
+        if first and first[0] == column:
+            return True
+    return False
+
+
+def _ensure_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Indexes the reset's predicates can seek on: the segment columns on questions,
+    every question_id/highlight_id used by the dependent deletes (SQLite does not
+    index foreign-key columns by itself), and the job payload expressions.
+    """
+    tables = {str(r[0]) for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    statements = ["CREATE INDEX IF NOT EXISTS idx_questions_category ON questions (source_material, category)"]
+    dependents = list(QUESTION_DEPENDENTS) + [("user_highlights", "question_id"), ("flashcard_highlight_usage", "highlight_id")]
+    for table, column in dependents:
+        if table in tables and not _has_leading_index(conn, table, column):
+            statements.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+    if "background_jobs" in tables:
+        statements.append(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_segment ON background_jobs ("
+            "type, json_extract(payload, '$.source_material'), "
+            "COALESCE(json_extract(payload, '$.main_header'), json_extract(payload, '$.category')))"
+        )
+    for sql in statements:
+        _write_block(conn, sql, ())
 
 
-def _delete_where_in(conn: sqlite3.Connection, table: str, column: str, ids: list[int]) -> int:
-    if not ids:
-        return 0
+def _write_block(conn: sqlite3.Connection, sql: str, params, *, many: bool = False) -> int:
+    """
+    Runs one write statement in its own short BEGIN IMMEDIATE transaction
+    (with many=True, once per parameter tuple in `params`).
+    """
+    for attempt in range(1, LOCK_RETRIES + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.executemany(sql, params) if many else conn.execute(sql, params)
+            conn.commit()
+            return int(cur.rowcount or 0)
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            if "locked" not in str(e) or attempt == LOCK_RETRIES:
+                raise
+            time.sleep(0.5 * attempt)
+    return 0
+
+
+def _delete_in(
+    conn: sqlite3.Connection,
+    table: str,
+    column: str,
+    subquery: str,
+    params: tuple,
+    *,
+    block_size: int,
+    block_sleep: float,
+) -> int:
+    """
+    Deletes the rows of `table` whose `column` is in `subquery`, at most block_size
+    rows per transaction, sleeping between blocks so the job worker can take the lock.
+    """
+    sql = (
+        f"DELETE FROM {table} WHERE rowid IN "
+        f"(SELECT rowid FROM {table} WHERE {column} IN ({subquery}) LIMIT ?)"
+    )
     total = 0
-    for chunk in _chunked(ids):
-        placeholders = ",".join(["?"] * len(chunk))
-        cur = conn.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", chunk)
-        total += int(cur.rowcount or 0)
-    return total
+    while True:
+        deleted = _write_block(conn, sql, params + (block_size,))
+        if not deleted:
+            return total
+        total += deleted
+        time.sleep(block_sleep)
 
 
 def _reset_segment(
@@ -110,43 +213,43 @@ def _reset_segment(
     *,
     dry_run: bool,
     reset_jobs: bool,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    block_sleep: float = DEFAULT_BLOCK_SLEEP_MS / 1000,
 ) -> dict:
     category_like = f"{segment.main_header}%"
+    params = (segment.source_material, category_like)
+
+    # Both segment counts in one round trip over a single scan of the questions.
+    counts = conn.execute(
+        f"""
+        WITH q AS ({SEGMENT_QUESTIONS})
+        SELECT (SELECT COUNT(*) FROM q),
+               (SELECT COUNT(*) FROM user_highlights WHERE question_id IN (SELECT id FROM q))
+        """,
+        params,
+    ).fetchone()
+    questions_matched, highlights_matched = int(counts[0]), int(counts[1])
 
-    question_ids = _fetch_ids(
-        conn,
-        "SELECT id FROM questions WHERE source_material = ? AND category LIKE ?",
-        (segment.source_material, category_like),
-    )
-
-    highlight_ids: list[int] = []
-    if question_ids:
-        placeholders = ",".join(["?"] * len(question_ids))
-        highlight_ids = _fetch_ids(
-            conn,
-            f"SELECT id FROM user_highlights WHERE question_id IN ({placeholders})",
-            tuple(question_ids),
-        )
-
-    job_status_counts = conn.execute(
+    # One row per matching job: the status summary is tallied here, and the
+    # payload count is read now so the reset UPDATE needs no JSON parsing.
+    jobs = conn.execute(
         """
-        SELECT status, COUNT(*)
+        SELECT id, status, COALESCE(CAST(json_extract(payload, '$.count') AS INTEGER), 0)
         FROM background_jobs
         WHERE type = 'generation_batch'
           AND json_extract(payload, '$.source_material') = ?
           AND COALESCE(json_extract(payload, '$.main_header'), json_extract(payload, '$.category')) = ?
-        GROUP BY status
-        ORDER BY COUNT(*) DESC
         """,
         (segment.source_material, segment.main_header),
     ).fetchall()
-    jobs_total = sum(int(r[1]) for r in job_status_counts)
+    job_status_counts = Counter(str(r[1]) for r in jobs).most_common()
+    jobs_total = len(jobs)
 
     summary = {
         "segment": {"source_material": segment.source_material, "main_header": segment.main_header},
-        "questions": {"matched": len(question_ids)},
-        "highlights": {"matched": len(highlight_ids)},
-        "jobs": {"matched": jobs_total, "by_status": {str(r[0]): int(r[1]) for r in job_status_counts}},
+        "questions": {"matched": questions_matched},
+        "highlights": {"matched": highlights_matched},
+        "jobs": {"matched": jobs_total, "by_status": dict(job_status_counts)},
         "deleted": {},
         "jobs_reset": 0,
     }
@@ -154,57 +257,71 @@ def _reset_segment(
     if dry_run:
         return summary
 
-    # Keep the write-lock window short.
-    conn.execute("BEGIN IMMEDIATE")
-    try:
-        deleted = {}
-
-        # Delete dependent rows first.
-        deleted["flashcard_highlight_usage"] = _delete_where_in(
-            conn, "flashcard_highlight_usage", "highlight_id", highlight_ids
+    # Keep the write-lock window short: every delete runs in blocks of block_size
+    # rows, one transaction each. An interrupted run leaves a consistent subset
+    # (dependents go before their questions) and can simply be re-run.
+    blocks = {"block_size": block_size, "block_sleep": block_sleep}
+    deleted = {}
+
+    # Dependents declared ON DELETE CASCADE are removed by SQLite with their
+    # parent row (only counted here for the summary); the rest are deleted
+    # explicitly, dependent rows first.
+    cascades = _cascading_tables(conn, "questions")
+    highlights_cascade = "user_highlights" in cascades
+    usage_cascades = "flashcard_highlight_usage" in _cascading_tables(conn, "user_highlights")
+
+    if usage_cascades:
+        deleted["flashcard_highlight_usage"] = _count_in(
+            conn, "flashcard_highlight_usage", "highlight_id", SEGMENT_HIGHLIGHTS, params
+        )
+    else:
+        deleted["flashcard_highlight_usage"] = _delete_in(
+            conn, "flashcard_highlight_usage", "highlight_id", SEGMENT_HIGHLIGHTS, params, **blocks
+        )
+    if highlights_cascade:
+        deleted["user_highlights"] = _count_in(conn, "user_highlights", "question_id", SEGMENT_QUESTIONS, params)
+    else:
+        deleted["user_highlights"] = _delete_in(
+            conn, "user_highlights", "question_id", SEGMENT_QUESTIONS, params, **blocks
         )
-        deleted["user_highlights"] = _delete_where_in(conn, "user_highlights", "id", highlight_ids)
 
-        deleted["reviews"] = _delete_where_in(conn, "reviews", "question_id", question_ids)
-        deleted["question_feedback"] = _delete_where_in(conn, "question_feedback", "question_id", question_ids)
-        deleted["content_feedback"] = _delete_where_in(conn, "content_feedback", "question_id", question_ids)
-        deleted["extended_explanations"] = _delete_where_in(conn, "extended_explanations", "question_id", question_ids)
-        deleted["visual_explanations"] = _delete_where_in(conn, "visual_explanations", "question_id", question_ids)
-        deleted["question_topic_links"] = _delete_where_in(conn, "question_topic_links", "question_id", question_ids)
+    for table, column in QUESTION_DEPENDENTS:
+        if table in cascades:
+            deleted[table] = _count_in(conn, table, column, SEGMENT_QUESTIONS, params)
+        else:
+            deleted[table] = _delete_in(conn, table, column, SEGMENT_QUESTIONS, params, **blocks)
 
-        deleted["questions"] = _delete_where_in(conn, "questions", "id", question_ids)
+    deleted["questions"] = _delete_in(conn, "questions", "id", SEGMENT_QUESTIONS, params, **blocks)
 
     # Reset jobs back to pending (do not touch processing jobs).
-        cur = None
-        if reset_jobs:
-            cur = conn.execute(
-                """
-                UPDATE background_jobs
-                SET status = 'pending',
-                    progress = 0,
-                    -- Helps the UI show an accurate target immediately after reset.
-                    total_items = COALESCE(CAST(json_extract(payload, '$.count') AS INTEGER), 0),
-                    worker_id = NULL,
-                    error_message = NULL,
-                    updated_at = ?,
-                    completed_at = NULL,
-                    generated_count = 0,
-                    attempts = 0
-                WHERE type = 'generation_batch'
-                  AND json_extract(payload, '$.source_material') = ?
-                  AND COALESCE(json_extract(payload, '$.main_header'), json_extract(payload, '$.category')) = ?
-                  AND status <> 'processing'
-                """,
-                (_now_ts(), segment.source_material, segment.main_header),
-            )
-
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
+    jobs_reset = 0
+    if reset_jobs:
+        # By primary key with the count read above; the status guard still skips a
+        # job the worker claimed in the meantime.
+        jobs_reset = _write_block(
+            conn,
+            """
+            UPDATE background_jobs
+            SET status = 'pending',
+                progress = 0,
+                -- Helps the UI show an accurate target immediately after reset.
+                total_items = ?,
+                worker_id = NULL,
+                error_message = NULL,
+                -- Local time like the app's own timestamps ('%f' = seconds.millis).
+                updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'),
+                completed_at = NULL,
+                generated_count = 0,
+                attempts = 0
+            WHERE id = ?
+              AND status <> 'processing'
+            """,
+            [(int(count), job_id) for job_id, status, count in jobs if status != "processing"],
+            many=True,
+        )
 
     summary["deleted"] = deleted
-    summary["jobs_reset"] = int(cur.rowcount or 0) if cur is not None else 0
+    summary["jobs_reset"] = jobs_reset
     return summary
 
 
@@ -223,6 +340,23 @@ def main(argv: list[str]) -> int:
         action="store_true",
         help="Only delete matching questions (and dependent rows). Do NOT reset jobs.",
     )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE,
+        help="Rows deleted per write transaction.",
+    )
+    parser.add_argument(
+        "--block-sleep-ms",
+        type=int,
+        default=DEFAULT_BLOCK_SLEEP_MS,
+        help="Pause between delete transactions so the job worker can write.",
+    )
+    parser.add_argument(
+        "--no-pragmas",
+        action="store_true",
+        help="Connect with SQLite defaults (no WAL/synchronous/cache tuning).",
+    )
     parser.add_argument(
         "--pause-generation",
         action="store_true",
@@ -241,22 +375,33 @@ def main(argv: list[str]) -> int:
         print(f"DB not found: {args.db}", file=sys.stderr)
         return 2
 
-    results = []
-    with _maybe_pause_generation(bool(args.pause_generation)):
-        conn = _connect(args.db)
+    def reset_one(seg: Segment) -> dict:
+        # One connection per worker thread; sqlite3 connections are not shared.
+        conn = _connect(args.db, tune=not args.no_pragmas)
         try:
-            for seg in segments:
-                results.append(
-                    _reset_segment(
-                        conn,
-                        seg,
-                        dry_run=bool(args.dry_run),
-                        reset_jobs=(not bool(args.delete_only)),
-                    )
-                )
+            return _reset_segment(
+                conn,
+                seg,
+                dry_run=bool(args.dry_run),
+                reset_jobs=(not bool(args.delete_only)),
+                block_size=max(1, args.block_size),
+                block_sleep=max(0, args.block_sleep_ms) / 1000,
+            )
         finally:
             conn.close()
 
+    with _maybe_pause_generation(bool(args.pause_generation)):
+        if not args.dry_run:
+            conn = _connect(args.db, tune=not args.no_pragmas)
+            try:
+                _ensure_indexes(conn)
+            finally:
+                conn.close()
+        # Segments run side by side: scans overlap, and the short delete blocks of
+        # different segments interleave on the write lock. map() keeps input order.
+        with ThreadPoolExecutor(max_workers=min(4, len(segments))) as pool:
+            results = list(pool.map(reset_one, segments))
+
     # Human-readable, stable output (no emojis).
     for r in results:
         seg = r["segment"]
@@ -1,67 +1,106 @@
 import json
-import sqlite3
 from pathlib import Path
 import sys
 import os
-import copy
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(PROJECT_ROOT))
 sys.path.append(str(PROJECT_ROOT / "new_web_app"))
 
 from new_web_app.core.generation_engine import GenerationEngine
+from _db import connect
 
 DB_PATH = Path(__file__).resolve().parent.parent / "shared" / "data" / "quiz_v2.db"
+# Rewritten rows per write transaction.
+FLUSH_SIZE = 1000
 
 
 def load_json_field(value):
     if not value:
         return None
     try:
-        return json.loads(value)
-    except json.JSONDecodeError:
+        return orjson.loads(value) if orjson is not None else json.loads(value)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
         return None
 
 
+def canonical_json(value):
+    """Key-sorted serialization, only used to detect whether a rewrite changed anything."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
 def main(dry_run: bool = True):
     engine = GenerationEngine(dry_run=True)
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT id, options, correct_answer_index, explanation_data, tags FROM questions")
-    rows = cursor.fetchall()
+    # Stream the scan on its own connection (WAL snapshot) while rewrites are
+    # committed in FLUSH_SIZE batches on a second one.
+    # Plain tuples (no sqlite3.Row factory): the loop unpacks them positionally.
+    read_conn = connect(DB_PATH)
+    write_conn = connect(DB_PATH)
+    # Only table blocks are rewritten; skip rows whose explanation has none
+    # without decoding them in Python (a '"table"' substring is a safe superset).
+    cursor = read_conn.execute(
+        """
+        SELECT id, options, correct_answer_index, explanation_data, tags
+        FROM questions
+        WHERE explanation_data LIKE '%"table"%'
+        """
+    )
 
     updates = []
-
-    for row in rows:
-        explanation = load_json_field(row["explanation_data"])
+    rewritten = 0
+    total = 0
+
+    def flush():
+        nonlocal rewritten
+        rewritten += len(updates)
+        if updates and not dry_run:
+            write_conn.execute("BEGIN IMMEDIATE")
+            try:
+                write_conn.executemany("UPDATE questions SET explanation_data = ? WHERE id = ?", updates)
+                write_conn.commit()
+            except Exception:
+                write_conn.rollback()
+                raise
+        updates.clear()
+
+    for qid, options_raw, correct_idx, explanation_raw, tags_raw in cursor:
+        total += 1
+        explanation = load_json_field(explanation_raw)
         if not explanation or not isinstance(explanation, dict):
             continue
 
-        before = json.dumps(explanation, ensure_ascii=False, sort_keys=True)
-        explanation_copy = copy.deepcopy(explanation)
+        # The serialized snapshot is all the comparison needs, so the engine can
+        # mutate the parsed dict in place (no deepcopy).
+        before = canonical_json(explanation)
 
         question_data = {
-            "options": load_json_field(row["options"]) or [],
-            "correct_answer_index": row["correct_answer_index"],
-            "explanation_data": explanation_copy,
-            "tags": load_json_field(row["tags"]) or []
+            "options": load_json_field(options_raw) or [],
+            "correct_answer_index": correct_idx,
+            "explanation_data": explanation,
+            "tags": load_json_field(tags_raw) or []
         }
 
         updated = engine._enforce_table_entity_labels(question_data)
         new_explanation = updated.get("explanation_data")
-        after = json.dumps(new_explanation, ensure_ascii=False, sort_keys=True)
+        after = canonical_json(new_explanation)
         if after != before:
-            updates.append((json.dumps(new_explanation, ensure_ascii=False), row["id"]))
+            updates.append((json.dumps(new_explanation, ensure_ascii=False), qid))
+            if len(updates) >= FLUSH_SIZE:
+                flush()
 
-    if updates and not dry_run:
-        cursor.executemany("UPDATE questions SET explanation_data = ? WHERE id = ?", updates)
-        conn.commit()
+    flush()
+    read_conn.close()
+    write_conn.close()
 
-    print(f"{'DRY RUN' if dry_run else 'APPLIED'}: {len(updates)} tables rewritten out of {len(rows)} rows.")
-    conn.close()
+    print(f"{'DRY RUN' if dry_run else 'APPLIED'}: {rewritten} tables rewritten out of {total} rows with tables.")
 
 
 if __name__ == "__main__":
@@ -1,14 +1,22 @@
 
 import requests
 import sys
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8000"  # Backend runs on 8000 usually, wait, Frontend is 3000, Backend?
 # I need to check backend port. Usually main.py runs on 8000.
 
+# One keep-alive connection to the backend for every step (register, login, endpoint).
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+session.headers.update({"User-Agent": "verify"})
+
 def login(username, password):
     url = f"{BASE_URL}/auth/login"
     data = {"username": username, "password": password}
-    response = requests.post(url, data=data)
+    response = session.post(url, data=data)
     if response.status_code == 200:
         return response.json()["access_token"]
     print(f"Login failed for {username}: {response.text}")
@@ -18,9 +26,9 @@ def test_endpoint(token, endpoint, method="POST", expected_status=200):
     url = f"{BASE_URL}{endpoint}"
     headers = {"Authorization": f"Bearer {token}"}
     if method == "POST":
-        response = requests.post(url, headers=headers, json={"limit": 10, "max_cards": 10}) # Dummy payload for flashcards
+        response = session.post(url, headers=headers, json={"limit": 10, "max_cards": 10}) # Dummy payload for flashcards
     else:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
     
     if response.status_code == expected_status:
         print(f"✅ Access to {endpoint} returned {response.status_code} as expected.")
@@ -40,7 +48,7 @@ def main():
     # 1. Register new user (Role: user)
     print(f"Registering new user: {username}")
     reg_url = f"{BASE_URL}/auth/register"
-    reg_res = requests.post(reg_url, json={"username": username, "password": password})
+    reg_res = session.post(reg_url, json={"username": username, "password": password})
     if reg_res.status_code != 200:
         print(f"Registration failed: {reg_res.text}")
         return
@@ -1,7 +1,10 @@
 import sys
 import os
 import logging
-import time
+import hashlib
+import sqlite3
+from array import array
+from pathlib import Path
 
 # Add project root to path
 sys.path.append("/home/yusuf-kemal-tuna/medical_quiz_app/new_web_app")
@@ -12,6 +15,50 @@ load_dotenv("/home/yusuf-kemal-tuna/medical_quiz_app/.env")
 from core.deduplicator import check_duplicate_hybrid, cosine_similarity
 from core.gemini_client import GeminiClient
 
+EMBED_MODEL = "text-embedding-004"  # what GeminiClient.get_text_embeddings_batch uses
+CACHE_PATH = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "tusabi" / "embeddings.db"
+
+
+def embed_cached(client, signatures):
+    """
+    Embeddings for signatures, reusing vectors cached on disk by (model, signature hash);
+    only the misses are sent to the API, in one batch.
+    """
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH)
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, sig_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, sig_hash))"
+        )
+        keys = [hashlib.blake2b(sig.encode("utf-8"), digest_size=16).hexdigest() for sig in signatures]
+        vectors = {}
+        for key in set(keys):
+            row = conn.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND sig_hash = ?", (EMBED_MODEL, key)
+            ).fetchone()
+            if row:
+                vec = array("d")
+                vec.frombytes(row[0])
+                vectors[key] = vec.tolist()
+
+        missing = {key: sig for key, sig in zip(keys, signatures) if key not in vectors}
+        if missing:
+            print(f"Embedding {len(missing)} signatures ({len(set(keys)) - len(missing)} cached)...")
+            embeddings = client.get_text_embeddings_batch(list(missing.values()))
+            for key, emb in zip(missing, embeddings):
+                vectors[key] = emb
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, sig_hash, vector) VALUES (?, ?, ?)",
+                [(EMBED_MODEL, key, array("d", vectors[key]).tobytes()) for key in missing if vectors[key]],
+            )
+            conn.commit()
+        return [vectors[key] for key in keys]
+    finally:
+        conn.close()
+
+
 def run_test_cases():
     client = GeminiClient()
     
@@ -75,21 +122,28 @@ def run_test_cases():
     passed_tests = 0
     total_tests = len(test_suite)
     
+    # Build Signatures (Answer First for better differentiation) and embed them
+    # all in one request (or none, when they are all cached on disk).
+    signatures = []
     for case in test_suite:
-        time.sleep(2.0) # Avoid rate limits
+        signatures.append(f"Answer: {case['base_a']} | Question: {case['base_q']}")
+        signatures.append(f"Answer: {case['cand_a']} | Question: {case['cand_q']}")
+
+    try:
+        embeddings = embed_cached(client, signatures)
+    except Exception as e:
+        print(f"❌ Embedding failed: {e}")
+        return
+
+    for i, case in enumerate(test_suite):
         print(f"🔹 CASE: {case['name']}")
-        
-        # Build Signatures (Answer First for better differentiation)
-        sig1 = f"Answer: {case['base_a']} | Question: {case['base_q']}"
-        sig2 = f"Answer: {case['cand_a']} | Question: {case['cand_q']}"
-        
+
+        sig1, sig2 = signatures[2 * i], signatures[2 * i + 1]
+        emb1, emb2 = embeddings[2 * i], embeddings[2 * i + 1]
+
         print(f"   Signature 1: {sig1}")
         print(f"   Signature 2: {sig2}")
-        
-        # Embed
-        emb1 = client.get_text_embedding(sig1)
-        emb2 = client.get_text_embedding(sig2)
-        
+
         if not emb1 or not emb2:
             print("   ❌ Embedding failed.")
             continue
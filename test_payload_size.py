@@ -1,24 +1,186 @@
 import json
-import sys
 import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 
-# Mock paths
-sys.path.append("/home/yusuf-kemal-tuna/medical_quiz_app")
-from new_web_app.backend.routers.pdfs import get_all_manifests
-from new_web_app.backend.routers.library import build_library_tree
+from new_web_app.core.fastjson import BACKEND, dumps, orjson
+from new_web_app.core.profiling import run_main
 
-print("Testing payload sizes...")
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 try:
-    manifests = get_all_manifests()
-    man_json = json.dumps(manifests)
-    print(f"Manifests Payload Size: {len(man_json) / 1024 / 1024:.2f} MB")
-except Exception as e:
-    print(f"Manifests Error: {e}")
+    import numpy as np
+except ImportError:
+    np = None
 
 try:
-    tree = build_library_tree(collapse_subtopics=True)
-    tree_json = json.dumps(tree)
-    print(f"Library Tree Payload Size: {len(tree_json) / 1024 / 1024:.2f} MB")
-except Exception as e:
-    print(f"Tree Error: {e}")
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+SHARED_DIR = PROJECT_ROOT / "shared"
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "tusabi"
+
+
+# Same settings as FastAPI's JSONResponse, so the count matches the wire.
+_ENCODER = json.JSONEncoder(ensure_ascii=False, check_circular=False, separators=(",", ":"))
+
+
+def numpyify(o):
+    """
+    Copy of o with float lists longer than 16 (embedding-like vectors) as NumPy
+    arrays, so orjson encodes them in C instead of boxing every element.
+    float64 keeps the encoded digits identical to the plain lists.
+    """
+    if isinstance(o, dict):
+        return {k: numpyify(v) for k, v in o.items()}
+    if isinstance(o, list):
+        if len(o) > 16 and all(type(x) is float for x in o):
+            return np.asarray(o, dtype=np.float64)
+        return [numpyify(v) for v in o]
+    return o
+
+
+def _encoded_chunks(obj):
+    if isinstance(obj, bytes):
+        # Already serialized (e.g. the /pdfs/manifests response body).
+        yield obj
+    elif orjson is not None and np is not None:
+        yield orjson.dumps(numpyify(obj), option=orjson.OPT_SERIALIZE_NUMPY)
+    elif BACKEND != "json":
+        yield dumps(obj)
+    else:
+        # The encoder's chunks as they are produced; the full string is never held.
+        for chunk in _ENCODER.iterencode(obj):
+            yield chunk.encode("utf-8")
+
+
+def payload_sizes(obj) -> dict:
+    """
+    Raw JSON size plus its gzip size (GZipMiddleware's level 9, as served) and,
+    when zstandard is installed, its zstd level-3 size; compressed in one
+    streaming pass over the encoded chunks.
+    """
+    sizes = {"raw": 0, "gzip": 0}
+    gz = zlib.compressobj(9, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    zs = zstd.ZstdCompressor(level=3).compressobj() if zstd is not None else None
+    if zs is not None:
+        sizes["zstd"] = 0
+    for chunk in _encoded_chunks(obj):
+        sizes["raw"] += len(chunk)
+        sizes["gzip"] += len(gz.compress(chunk))
+        if zs is not None:
+            sizes["zstd"] += len(zs.compress(chunk))
+    sizes["gzip"] += len(gz.flush())
+    if zs is not None:
+        sizes["zstd"] += len(zs.flush())
+    return sizes
+
+
+def format_sizes(label: str, sizes: dict) -> str:
+    parts = ", ".join(f"{name} {size / 1024 / 1024:.2f} MB" for name, size in sizes.items() if name != "raw")
+    return f"{label} Payload Size: {sizes['raw'] / 1024 / 1024:.2f} MB ({parts})"
+
+
+def source_files():
+    """
+    What the two builders read (the SQLite question DB and its WAL, the library
+    index, the merged topic groups and the manifests) plus the builder code itself.
+    """
+    data_dir = SHARED_DIR / "data"
+    yield data_dir / "quiz_v2.db"
+    yield data_dir / "quiz_v2.db-wal"
+    yield data_dir / "medquiz_library.json"
+    yield data_dir / "merged_topic_groups.json"
+    yield from (SHARED_DIR / "processed_pdfs").glob("*/*/manifest.json")
+    backend_dir = PROJECT_ROOT / "new_web_app" / "backend"
+    yield backend_dir / "database.py"
+    yield backend_dir / "routers" / "pdfs.py"
+    yield backend_dir / "routers" / "library.py"
+
+
+def newest_source_mtime() -> float:
+    newest = 0.0
+    for path in source_files():
+        try:
+            newest = max(newest, path.stat().st_mtime)
+        except OSError:
+            pass
+    return newest
+
+
+def cached(name, build, *, raw=False):
+    """
+    Result of build(), reused from a file under CACHE_DIR while it is newer than
+    every source file. raw=True stores build()'s bytes as they are; anything else
+    goes through msgpack when installed, JSON otherwise.
+
+    On Postgres the file mtimes say nothing about the data, so build() always runs.
+    """
+    if get_db_engine() != "sqlite":
+        return build()
+    suffix = "bin" if raw else "msgpack" if msgpack is not None else "json"
+    cache_path = CACHE_DIR / f"{name}.{suffix}"
+    if cache_path.exists() and cache_path.stat().st_mtime > newest_source_mtime():
+        data = cache_path.read_bytes()
+        if raw:
+            return data
+        return msgpack.unpackb(data, raw=False) if msgpack is not None else json.loads(data)
+    result = build()
+    if raw:
+        data = result
+    else:
+        data = msgpack.packb(result) if msgpack is not None else dumps(result)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path.write_bytes(data)
+    return result
+
+
+# The script lives at the project root, so new_web_app is importable from
+# sys.path[0] without appending anything.
+from new_web_app.backend.database import get_db_engine
+from new_web_app.backend.routers.pdfs import get_all_manifests_bytes
+from new_web_app.backend.routers.library import build_library_tree
+
+
+def measure_manifests() -> str:
+    try:
+        # The exact bytes the endpoint serves, so nothing is re-encoded here.
+        manifests = cached("manifests_bytes", lambda: get_all_manifests_bytes()[0], raw=True)
+        return format_sizes("Manifests", payload_sizes(manifests))
+    except Exception as e:
+        return f"Manifests Error: {e}"
+
+
+def measure_tree() -> str:
+    try:
+        tree = cached("library_tree", lambda: build_library_tree(collapse_subtopics=True))
+        return format_sizes("Library Tree", payload_sizes(tree))
+    except Exception as e:
+        return f"Tree Error: {e}"
+
+
+def main():
+    print("Testing payload sizes...")
+
+    if "--profile" in sys.argv or "--lineprof" in sys.argv:
+        # Profilers only see this process, so measure in-process.
+        for measure in (measure_manifests, measure_tree):
+            print(measure())
+        return
+
+    # Independent and CPU-bound (serialization holds the GIL), so one process each.
+    with ProcessPoolExecutor(max_workers=2) as ex:
+        futs = [ex.submit(measure_manifests), ex.submit(measure_tree)]
+        for f in as_completed(futs):
+            print(f.result())
+
+
+if __name__ == "__main__":
+    run_main(main, line_targets=(payload_sizes, numpyify))
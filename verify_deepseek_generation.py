@@ -1,19 +1,99 @@
 
+import hashlib
+import inspect
+import json
 import logging
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
 from new_web_app.core.generation_engine import GenerationEngine
+from new_web_app.core.profiling import run_main
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Quiet by default; LOG_LEVEL=INFO shows the pipeline logs.
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> GenerationEngine:
+    """One engine (and its API clients) per process, shared by every verification."""
+    return GenerationEngine(dry_run=True, provider="deepseek")
+
+
+# With --replay, each LLM call's response is stored here on first use and replayed
+# on identical later calls, so the pipeline (draft handling, explanation assembly,
+# table refinement, schema validation) still runs but costs no API calls. Delete
+# the directory to force fresh responses.
+CACHE_DIR = Path(".verify_cache")
+# GeminiClient methods that talk to the model during generate_question.
+REPLAYED_CALLS = ("draft_question", "generate_explanation_blocks", "refine_table_block", "repair_json")
+
+
+def _replay_path(key_source: str) -> Path:
+    key = hashlib.blake2b(key_source.encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{key}.{'msgpack' if msgpack is not None else 'json'}"
+
+
+def load_replay(path: Path):
+    if not path.exists():
+        return None
+    data = path.read_bytes()
+    return msgpack.unpackb(data, raw=False) if msgpack is not None else json.loads(data)
+
+
+def save_replay(path: Path, result: dict) -> None:
+    CACHE_DIR.mkdir(exist_ok=True)
+    if msgpack is not None:
+        path.write_bytes(msgpack.packb(result))
+    else:
+        path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+
+
+def enable_replay(engine: GenerationEngine) -> dict:
+    """
+    Wraps engine.client's LLM calls with the on-disk replay cache; returns live
+    hit/miss counters. Keys cover the call's arguments and the client's source, so
+    editing a prompt (or what the engine passes in) misses and calls the model.
+    """
+    stats = {"replayed": 0, "called": 0}
+    client_source = Path(inspect.getsourcefile(type(engine.client))).read_bytes()
+    fingerprint = hashlib.blake2b(client_source).hexdigest()
+
+    for name in REPLAYED_CALLS:
+        def replayed(*args, _name=name, _call=getattr(engine.client, name), **kwargs):
+            key_source = json.dumps([fingerprint, _name, args, kwargs], ensure_ascii=False, sort_keys=True, default=repr)
+            path = _replay_path(key_source)
+            stored = load_replay(path)
+            if stored is not None:
+                stats["replayed"] += 1
+                return stored["value"]
+            value = _call(*args, **kwargs)
+            stats["called"] += 1
+            if value:
+                save_replay(path, {"value": value})
+            return value
+
+        setattr(engine.client, name, replayed)
+    return stats
 
-logging.basicConfig(level=logging.INFO)
 
 def test_generation():
     print("🚀 Starting DeepSeek Verification Generation...")
     
     # Initialize Engine (Default is DeepSeek now)
-    engine = GenerationEngine(dry_run=True, provider="deepseek")
+    engine = get_engine()
+    replay = enable_replay(engine) if "--replay" in sys.argv else None
     
     # Test Data
     concept = "Akut Pankreatit"
     topic = "Genel Cerrahi"
     source = "Test Source"
+    difficulty = 3
     
     # Fake Evidence (usually retrieved, but we override for testing)
     fake_evidence = """
@@ -30,15 +110,20 @@ def test_generation():
             concept=concept,
             topic=topic,
             source_material=source,
-            difficulty=3,
+            difficulty=difficulty,
             evidence_override=fake_evidence
         )
-        
+
         if result:
             print("\n✅ Verification SUCCESS!")
             print(f"   Question: {result.get('question_text')}")
             print(f"   Model used (Provider): {engine.provider}")
             print(f"   Steps validated: Draft, Critique, Explanation, Schema Validation")
+            if replay and replay["replayed"]:
+                print(
+                    f"   ⚠️ --replay: {replay['replayed']} LLM response(s) came from {CACHE_DIR}/ "
+                    f"({replay['called']} live); the model's behaviour was not re-verified."
+                )
         else:
             print("\n❌ Verification FAILED: Result is None")
             
@@ -48,4 +133,4 @@ def test_generation():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    test_generation()
+    run_main(test_generation, line_targets=(GenerationEngine.generate_question,))
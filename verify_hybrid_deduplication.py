@@ -1,18 +1,88 @@
 
 import os
+import math
+import time
 import logging
-from dotenv import load_dotenv
+from new_web_app.core.config import env
 from new_web_app.core.gemini_client import GeminiClient
+from new_web_app.core.profiling import run_main
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Configure logging (quiet by default; LOG_LEVEL=INFO shows the pipeline logs)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+
+# Texts sent in the batched-embedding throughput check.
+BATCH_SIZE = 32
+
+
+def binary_quantize(embedding) -> bytes:
+    """One sign bit per dimension, packed 8 per byte (same layout as np.packbits)."""
+    if np is not None:
+        return np.packbits(np.asarray(embedding, dtype=np.float32) > 0).tobytes()
+    pad = -len(embedding) % 8
+    bits = "".join("1" if x > 0 else "0" for x in embedding) + "0" * pad
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def hamming_distance(a: bytes, b: bytes) -> int:
+    return bin(int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).count("1")
+
+
+def _percentile(values, pct: float) -> float:
+    """Linear-interpolated percentile (NumPy's default method)."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def int8_quantize(embedding, percentiles=(2.5, 97.5)):
+    """
+    Scalar-quantizes to int8 over the [lo, hi] percentile range (outliers are
+    clipped). Returns (codes, lo, hi); dequantize with int8_dequantize.
+    """
+    if np is not None:
+        v = np.asarray(embedding, dtype=np.float32)
+        lo, hi = (float(x) for x in np.percentile(v, percentiles))
+        scale = (hi - lo) or 1.0
+        codes = np.round((np.clip(v, lo, hi) - lo) / scale * 255 - 128).astype(np.int8)
+        return codes.tolist(), lo, hi
+    lo, hi = (_percentile(embedding, pct) for pct in percentiles)
+    scale = (hi - lo) or 1.0
+    codes = [int(round((min(max(x, lo), hi) - lo) / scale * 255 - 128)) for x in embedding]
+    return codes, lo, hi
+
+
+def int8_dequantize(codes, lo: float, hi: float) -> list:
+    return [lo + (c + 128) / 255 * (hi - lo) for c in codes]
+
+
+def cosine_similarity(v1, v2) -> float:
+    if np is not None:
+        a = np.asarray(v1, dtype=np.float64)
+        b = np.asarray(v2, dtype=np.float64)
+        norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+        return float(a @ b) / norm if norm else 0.0
+    dot = sum(a * b for a, b in zip(v1, v2))
+    norm = math.sqrt(sum(a * a for a in v1)) * math.sqrt(sum(b * b for b in v2))
+    return dot / norm if norm else 0.0
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 
 def verify_hybrid_deduplication():
     print("🚀 Verifying Hybrid Deduplication Setup...")
     
-    # Load .env
-    load_dotenv()
-    gemini_key = os.getenv("GEMINI_API_KEY")
+    # Load .env (shared with the core modules, which already loaded it on import)
+    gemini_key = env().get("GEMINI_API_KEY")
     if not gemini_key:
         print("❌ GEMINI_API_KEY not found in .env")
         return
@@ -33,10 +103,65 @@ def verify_hybrid_deduplication():
         test_text = "Medical concept for verification."
         print(f"🧬 Generating embedding for: '{test_text}'")
         
+        started = time.perf_counter()
         embedding = client.get_text_embedding(test_text)
+        single_seconds = time.perf_counter() - started
         
         if embedding and isinstance(embedding, list) and len(embedding) > 0:
             print(f"✅ Success! Generated embedding with length: {len(embedding)}")
+
+            # Converted to a float32 array once; every check below runs on it
+            # vectorized (the plain list is used when NumPy is missing).
+            vec = np.asarray(embedding, dtype=np.float32) if np is not None else embedding
+
+            # Binary quantization: 1 bit per dimension instead of a float32.
+            packed = binary_quantize(vec)
+            float_bytes = 4 * len(embedding)
+            ones = hamming_distance(packed, bytes(len(packed)))
+            print(f"📦 Binary quantized: {len(packed)} bytes vs {float_bytes} bytes float32 ({float_bytes / len(packed):.0f}x)")
+            print(f"   Positive dimensions: {ones}/{len(embedding)}")
+            if not 0.25 <= ones / len(embedding) <= 0.75:
+                print("⚠️ Sign bits are heavily skewed; binary codes will separate vectors poorly.")
+
+            # Int8 scalar quantization: 1 byte per dimension; the round trip must keep
+            # the vector's direction (cosine) essentially intact.
+            codes, lo, hi = int8_quantize(vec)
+            restored_cos = cosine_similarity(vec, int8_dequantize(codes, lo, hi))
+            status = "✅" if restored_cos > 0.99 else "❌"
+            print(f"{status} Int8 quantized: {len(codes)} bytes vs {float_bytes} bytes float32 ({float_bytes / len(codes):.0f}x), round-trip cosine {restored_cos:.5f}")
+
+            if np is not None:
+                # float16 storage: 2x smaller with no binning; cosine error should be ~1e-6.
+                half = vec.astype(np.float16)
+                half_error = 1.0 - cosine_similarity(vec, half)
+                status = "✅" if half_error < 2e-6 else "⚠️"
+                print(f"{status} Float16: {half.nbytes} bytes vs {float_bytes} bytes float32, cosine error {half_error:.1e}")
+
+            if torch is not None and hasattr(torch, "float8_e4m3fn"):
+                # FP8-E4M3 cast, scaled per vector into the format's range (max 448) so
+                # small components don't fall into its coarse subnormals.
+                v = torch.tensor(embedding, dtype=torch.float32)
+                scale = 448.0 / max(float(v.abs().max()), 1e-12)
+                v8 = (v * scale).to(torch.float8_e4m3fn)
+                recon = v8.to(torch.float32) / scale
+                fp8_cos = torch.nn.functional.cosine_similarity(v[None], recon[None]).item()
+                status = "✅" if fp8_cos > 0.999 else "❌"
+                print(f"{status} FP8-E4M3: {v8.numel() * v8.element_size()} bytes vs {float_bytes} bytes float32, round-trip cosine {fp8_cos:.5f}")
+
+            paraphrase = "A medical concept used for verification."
+            other = client.get_text_embedding(paraphrase)
+            if other and len(other) == len(embedding):
+                distance = hamming_distance(packed, binary_quantize(other))
+                print(f"   Hamming distance to '{paraphrase}': {distance}/{len(embedding)}")
+
+            # Throughput of the batched path the real dedup workload uses: one
+            # request for many texts instead of one round trip per text.
+            batch_texts = [f"{test_text} ({i})" for i in range(BATCH_SIZE)]
+            started = time.perf_counter()
+            batch = client.get_text_embeddings_batch(batch_texts)
+            batch_seconds = time.perf_counter() - started
+            print(f"⏱️ Single: {single_seconds * 1000:.0f} ms/item")
+            print(f"⏱️ Batch of {len(batch)}: {batch_seconds * 1000 / len(batch):.0f} ms/item ({len(batch) / batch_seconds:.1f} items/s)")
             print("🎉 Hybrid Deduplication is READY.")
         else:
             print("❌ Failed to generate embedding (returned empty/None).")
@@ -47,4 +172,4 @@ def verify_hybrid_deduplication():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    verify_hybrid_deduplication()
+    run_main(verify_hybrid_deduplication)